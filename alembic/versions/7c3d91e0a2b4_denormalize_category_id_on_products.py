@@ -0,0 +1,39 @@
+"""denormalize category_id on products
+
+Revision ID: 7c3d91e0a2b4
+Revises: e6b2f64cc8fe
+Create Date: 2026-10-19 19:40:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3d91e0a2b4'
+down_revision: Union[str, None] = 'e6b2f64cc8fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('category_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE products p SET category_id = sc.category_id "
+        "FROM sub_categories sc WHERE sc.id = p.sub_category_id"
+    )
+    op.alter_column('products', 'category_id', nullable=False)
+    op.create_foreign_key('products_category_id_fkey', 'products', 'categories', ['category_id'], ['id'])
+    op.create_index(
+        'ix_products_category_id_is_active_id', 'products', ['category_id', 'is_active', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_category_id_is_active_id', table_name='products')
+    op.drop_constraint('products_category_id_fkey', 'products', type_='foreignkey')
+    op.drop_column('products', 'category_id')
@@ -0,0 +1,55 @@
+"""add products attributes
+
+Revision ID: b81f4c6d2e09
+Revises: 7c3d91e0a2b4
+Create Date: 2026-10-19 20:05:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f4c6d2e09'
+down_revision: Union[str, None] = '7c3d91e0a2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'products',
+        sa.Column('attributes', postgresql.JSONB(), server_default=sa.text("'{}'::jsonb"), nullable=False),
+    )
+    op.execute("""
+        UPDATE products SET attributes = coalesce((
+            SELECT jsonb_object_agg(a.name, a.vals)
+            FROM (
+                SELECT lower(trim(f.name)) AS name, jsonb_agg(DISTINCT v.value ORDER BY v.value) AS vals
+                FROM product_specific_features psf
+                JOIN product_features f ON f.id = psf.feature_id
+                CROSS JOIN LATERAL (
+                    VALUES (lower(trim(f.value))), (lower(trim(f.value) || coalesce(trim(f.unit), '')))
+                ) AS v(value)
+                WHERE psf.product_id = products.id
+                  AND f.is_active IS NOT FALSE
+                  AND coalesce(trim(f.value), '') <> ''
+                GROUP BY 1
+            ) a
+        ), '{}'::jsonb)
+        WHERE id IN (SELECT product_id FROM product_specific_features)
+    """)
+    op.create_index(
+        'ix_products_attributes', 'products', ['attributes'],
+        unique=False, postgresql_using='gin', postgresql_ops={'attributes': 'jsonb_path_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_attributes', table_name='products')
+    op.drop_column('products', 'attributes')
@@ -0,0 +1,36 @@
+"""add slug pattern indexes
+
+Revision ID: c4a7e2d95f13
+Revises: b81f4c6d2e09
+Create Date: 2026-10-19 21:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e2d95f13'
+down_revision: Union[str, None] = 'b81f4c6d2e09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_products_slug_pattern', 'products', ['slug'],
+        unique=False, postgresql_ops={'slug': 'varchar_pattern_ops'},
+    )
+    op.create_index(
+        'ix_vendors_vendor_slug_pattern', 'vendors', ['vendor_slug'],
+        unique=False, postgresql_ops={'vendor_slug': 'varchar_pattern_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_vendors_vendor_slug_pattern', table_name='vendors')
+    op.drop_index('ix_products_slug_pattern', table_name='products')
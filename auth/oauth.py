@@ -55,7 +55,6 @@ async def get_or_create_user(db: AsyncSession, email: str, name: str = "") -> Us
         )
         db.add(user)
         await db.commit()
-        await db.refresh(user)
     return user
 
 
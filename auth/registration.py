@@ -33,7 +33,6 @@ async def register_user(db: AsyncSession, user: UserSchema) -> Users:
 
         db.add(new_user)
         await db.flush()
-        await db.refresh(new_user)  
         await db.commit()
 
         return new_user
@@ -66,7 +66,6 @@ async def update_bank_details(
         db_bank_details.is_active = bank_details.is_active
 
         await db.commit()
-        await db.refresh(db_bank_details)
 
         return db_bank_details
 
@@ -99,7 +98,6 @@ async def create_bank_details(db: AsyncSession, bank_data: BankDetailsSchema):
 
         db.add(new_bank_detail)
         await db.commit()
-        await db.refresh(new_bank_detail)
 
         return new_bank_detail
 
@@ -3,6 +3,7 @@ from sqlalchemy.future import select
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
 from models import *
+from utils.feed_cache import invalidate_feed
 
 
 
@@ -44,7 +45,7 @@ async def create_best_seller(db: AsyncSession, vendor_id: int):
 
         db.add(new_best_seller)
         await db.commit()
-        await db.refresh(new_best_seller)
+        invalidate_feed("best_sellers")
 
         return new_best_seller
 
@@ -80,7 +81,7 @@ async def update_best_seller(db: AsyncSession, id: int, vendor_id: int):
         best_seller.rank = rank
 
         await db.commit()
-        await db.refresh(best_seller)
+        invalidate_feed("best_sellers")
         return best_seller
 
     except SQLAlchemyError as e:
@@ -8,6 +8,7 @@ from models.brands.brands import Brands
 from schemas.brands.brands import BrandSchema
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.exc import SQLAlchemyError
+from utils.feed_cache import invalidate_feed
 
 
 async def get_brands_by_id(db: AsyncSession, id: int):
@@ -82,7 +83,7 @@ async def update_brand(
             db_brand.image = file_path
 
         await db.commit()
-        await db.refresh(db_brand)
+        invalidate_feed("brands")
 
         return serialize_brand(db_brand)
 
@@ -125,7 +126,7 @@ async def create_brand(
         
         db.add(new_brand)
         await db.commit()
-        await db.refresh(new_brand)
+        invalidate_feed("brands")
         
         return serialize_brand(new_brand)
 
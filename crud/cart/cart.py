@@ -40,7 +40,6 @@ async def create_cart_with_items(
             created_items.append(cart_item)
 
         await db.commit()
-        await db.refresh(db_cart)
 
         return {
             "cart": db_cart,
@@ -205,7 +204,6 @@ async def update_cart_with_items(
             new_items.append(cart_item)
 
         await db.commit()
-        await db.refresh(db_cart)
 
         return {
             "cart": db_cart,
@@ -26,7 +26,6 @@ async def create_cart_item(db: AsyncSession, cart_item: CartItemsSchema):
 
     db.add(db_cart_item)
     await db.commit()
-    await db.refresh(db_cart_item)
     return db_cart_item
 
 
@@ -64,7 +63,6 @@ async def update_cart_item(db: AsyncSession, cart_item_id: int, cart_item_update
     db_cart_item.cost = product.payable_price * quantity
 
     await db.commit()
-    await db.refresh(db_cart_item)
     return db_cart_item
 
 
@@ -8,6 +8,20 @@ from models import *
 from sqlalchemy import select, func
 from sqlalchemy.orm import joinedload
 from typing import Optional
+from functools import lru_cache
+from utils.projection import projection, pick
+from utils.feed_cache import invalidate_feed
+from utils.images import derivative_urls
+
+CATEGORY_PRODUCT_FIELDS = (
+    "id", "name", "description", "meta_title", "meta_description", "brand_id", "vendor_id",
+    "price", "payable_price", "available_stock", "discount_type", "discount_amount",
+    "images", "highlighted_image", "is_active", "created_at",
+)
+CATEGORY_LIST_FIELDS = (
+    "id", "name", "description", "meta_title", "meta_description", "is_active", "image",
+    "image_variants", "created_at", "sub_categories",
+)
 
 async def get_products_by_category_id(
     db: AsyncSession, 
@@ -18,16 +32,14 @@ async def get_products_by_category_id(
     try:
         total_query = await db.execute(
             select(func.count(Products.id))
-            .join(SubCategories)
-            .where(SubCategories.category_id == category_id)
+            .where(Products.category_id == category_id)
         )
         total = total_query.scalar_one()
 
         result = await db.execute(
             select(Products)
-            .join(SubCategories)
-            .where(SubCategories.category_id == category_id)
-            .options(joinedload(Products.sub_categories))
+            .where(Products.category_id == category_id)
+            .options(*projection(Products, CATEGORY_PRODUCT_FIELDS + ("sub_category_id",)))
             .offset((page - 1) * limit)
             .limit(limit)
         )
@@ -35,25 +47,7 @@ async def get_products_by_category_id(
 
         return {
             "data": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "description": p.description,
-                    "meta_title": p.meta_title,
-                    "meta_description": p.meta_description,
-                    "brand_id": p.brand_id,
-                    "vendor_id": p.vendor_id,
-                    "price": p.price,
-                    "payable_price": p.payable_price,
-                    "available_stock": p.available_stock,
-                    "discount_type": p.discount_type,
-                    "discount_amount": p.discount_amount,
-                    "images": p.images,
-                    "highlighted_image": p.highlighted_image,
-                    "is_active": p.is_active,
-                    "created_at": p.created_at,
-                    "subcategory_id": p.sub_category_id
-                }
+                {**pick(p, CATEGORY_PRODUCT_FIELDS), "subcategory_id": p.sub_category_id}
                 for p in products
             ],
             "meta": {
@@ -80,17 +74,35 @@ async def get_category_by_id(db: AsyncSession, id: int):
     return db_category  
 
 
+# Sub categories are only loaded when the field set includes them.
+@lru_cache(maxsize=256)
+def category_list_options(fields: tuple):
+    relationships = []
+    if "sub_categories" in fields:
+        relationships.append(
+            selectinload(Categories.sub_categories)
+            .load_only(SubCategories.name, SubCategories.image, SubCategories.created_at)
+            .raiseload("*")
+        )
+    columns = [name for name in fields if name not in ("sub_categories", "image_variants")]
+    if "image_variants" in fields and "image" not in columns:
+        columns.append("image")
+    return tuple(projection(Categories, columns, *relationships))
+
+
 #Get all Categories with the sub-categories
 async def get_all_categories(
     db: AsyncSession,
     page: int = 1,
     limit: int = 20,
-    is_active: Optional[bool] = None
+    is_active: Optional[bool] = None,
+    fields: Optional[tuple] = None,
 ):
     page = max(page, 1)
     limit = max(limit, 1)
     offset = (page - 1) * limit
-    query = select(Categories).options(selectinload(Categories.sub_categories))
+    fields = fields or CATEGORY_LIST_FIELDS
+    query = select(Categories).options(*category_list_options(fields))
 
     if is_active is not None:
         query = query.where(Categories.is_active == is_active)
@@ -104,29 +116,27 @@ async def get_all_categories(
 
     categories = result.scalars().all()
 
+    columns = [name for name in fields if name not in ("sub_categories", "image_variants")]
+    data = []
+    for c in categories:
+        item = pick(c, columns)
+        if "image_variants" in fields:
+            item["image_variants"] = derivative_urls(c.image)
+        if "sub_categories" in fields:
+            item["sub_categories"] = [
+                {
+                    "id": sub.id,
+                    "name": sub.name,
+                    "image": sub.image,
+                    "image_variants": derivative_urls(sub.image),
+                    "created_at": sub.created_at,
+                }
+                for sub in c.sub_categories
+            ]
+        data.append(item)
+
     return {
-        "data": [
-            {
-                "id": c.id,
-                "name": c.name,
-                "description": c.description,
-                "meta_title": c.meta_title,
-                "meta_description": c.meta_description,
-                "is_active": c.is_active,
-                "image": c.image,
-                "created_at": c.created_at,
-                "sub_categories": [
-                    {
-                        "id": sub.id,
-                        "name": sub.name,
-                        "image": sub.image,
-                        "created_at": sub.created_at,
-                    }
-                    for sub in c.sub_categories
-                ]
-            }
-            for c in categories
-        ],
+        "data": data,
         "meta": {
             "total": total,
             "page": page,
@@ -177,11 +187,12 @@ async def update_category(
             db_category.image = file_path
 
         await db.commit()
-        await db.refresh(db_category)
+        invalidate_feed("categories", "sliders")
 
         return {
             "name": db_category.name,
             "image": db_category.image,
+            "image_variants": derivative_urls(db_category.image),
             "description": db_category.description,
             "is_active": db_category.is_active,
             "meta_title": db_category.meta_title,
@@ -226,7 +237,7 @@ async def create_category(
 
         db.add(new_category)
         await db.commit()
-        await db.refresh(new_category)
+        invalidate_feed("categories")
 
         return new_category
 
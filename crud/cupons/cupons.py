@@ -27,7 +27,6 @@ async def create_cupon(db: AsyncSession, cupon_data: CuponsSchema):
         )
         db.add(db_cupon)
         await db.commit()
-        await db.refresh(db_cupon)
         return db_cupon
     except Exception as e:
         await db.rollback()
@@ -124,7 +123,6 @@ async def update_cupon(db: AsyncSession, cupon_id: int, cupon_data: CuponsSchema
         cupon.expires_at = cupon_data.expires_at
 
         await db.commit()
-        await db.refresh(cupon)
         return cupon
     except Exception as e:
         await db.rollback()
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from functools import partial
+from sqlalchemy.future import select
+from models import *
+from database.db import read_session
+from crud.slider.slider import get_all_sliders
+from crud.categories.categories import get_all_categories
+from crud.best_seller.best_seller import get_all_best_sellers
+from crud.brands.brands import get_all_brands
+from crud.products.products import product_list_query
+from utils.serializers.serialize_product import serialize_product
+from utils.feed_cache import cached_section
+
+NEW_ARRIVAL_FIELDS = (
+    "id", "name", "slug", "price", "payable_price", "discount_type", "discount_amount",
+    "highlighted_image", "vendor_id",
+)
+
+
+async def load_sliders(db):
+    return (await get_all_sliders(db, 1, 10, is_active=True))["data"]
+
+
+async def load_categories(db):
+    return (await get_all_categories(db, 1, 100, is_active=True))["data"]
+
+
+async def load_best_sellers(db):
+    best_sellers = await get_all_best_sellers(db, 0, 10)
+    return [{"id": b.id, "vendor_id": b.vendor_id, "rank": b.rank} for b in best_sellers]
+
+
+async def load_brands(db):
+    return (await get_all_brands(db, 1, 30, is_active=True))["data"]
+
+
+async def load_new_arrivals(db):
+    result = await db.execute(
+        product_list_query(NEW_ARRIVAL_FIELDS)
+        .where(Products.is_active == True)
+        # created_at is a string column; ids are assigned in insert order.
+        .order_by(Products.id.desc())
+        .limit(20)
+    )
+    return [serialize_product(product, NEW_ARRIVAL_FIELDS) for product in result.scalars().all()]
+
+
+# Home feed sections in response order, with the loader and TTL (seconds) of
+# each. Writers invalidate their section through utils.feed_cache.
+FEED_SECTIONS = {
+    "sliders": {"load": load_sliders, "ttl": 60},
+    "categories": {"load": load_categories, "ttl": 300},
+    "best_sellers": {"load": load_best_sellers, "ttl": 300},
+    "brands": {"load": load_brands, "ttl": 300},
+    "new_arrivals": {"load": load_new_arrivals, "ttl": 60},
+}
+
+
+# Each section that has to be reloaded gets its own session, so a cold feed
+# runs its queries in parallel instead of one after another on one session.
+async def load_with_session(load):
+    async with read_session() as db:
+        return await load(db)
+
+
+async def get_home_feed() -> bytes:
+    sections = await asyncio.gather(*(
+        cached_section(name, section["ttl"], partial(load_with_session, section["load"]))
+        for name, section in FEED_SECTIONS.items()
+    ))
+    return b"{" + b",".join(
+        json.dumps(name).encode() + b":" + body for name, body in zip(FEED_SECTIONS, sections)
+    ) + b"}"
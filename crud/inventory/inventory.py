@@ -7,7 +7,14 @@ from models.inventory.inventory import InventoryTypeEnum
 from schemas.inventory.inventory import InventorySchema
 from sqlalchemy.orm import joinedload
 from models import *
+from utils.projection import projection, pick
+from utils.export import export_response, ExportFormat
 
+INVENTORY_LIST_FIELDS = (
+    "id", "unit_price", "total_quantity", "total_price", "inventory_type",
+    "invoice_number", "notes", "created_at", "updated_at",
+)
+INVENTORY_EXPORT_FIELDS = INVENTORY_LIST_FIELDS + ("product_id", "vendor_id")
 
 
 async def create_inventory(db: AsyncSession, data: InventorySchema):
@@ -50,7 +57,6 @@ async def create_inventory(db: AsyncSession, data: InventorySchema):
 
         # Step 5: Commit Changes
         await db.commit()
-        await db.refresh(new_inventory)
 
         print(f"Creating inventory for product_id={data.product_id} with type={data.inventory_type}")
         return new_inventory
@@ -63,6 +69,36 @@ async def create_inventory(db: AsyncSession, data: InventorySchema):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def inventory_filters(product_id: Optional[int] = None, vendor_id: Optional[int] = None):
+    filters = []
+    if product_id:
+        filters.append(Inventory.product_id == product_id)
+    if vendor_id:
+        filters.append(Inventory.vendor_id == vendor_id)
+    return filters
+
+
+def export_inventories(
+    export_format: ExportFormat,
+    after_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+):
+    query = (
+        select(Inventory)
+        .options(*projection(Inventory, INVENTORY_EXPORT_FIELDS))
+        .where(*inventory_filters(product_id, vendor_id))
+    )
+    return export_response(
+        query,
+        Inventory.id,
+        lambda inv: pick(inv, INVENTORY_EXPORT_FIELDS),
+        export_format,
+        "inventory",
+        after_id,
+    )
+
+
 async def get_all_inventories(
     db: AsyncSession,
     page: int = 1,
@@ -75,20 +111,9 @@ async def get_all_inventories(
         limit = max(limit, 1)
         offset = (page - 1) * limit
 
-        base_query = select(Inventory).options(
-            joinedload(Inventory.products),
-            joinedload(Inventory.vendors).joinedload(Vendors.users),
-        )
-
-        count_query = select(func.count()).select_from(Inventory)
-
-        if product_id:
-            base_query = base_query.where(Inventory.product_id == product_id)
-            count_query = count_query.where(Inventory.product_id == product_id)
-
-        if vendor_id:
-            base_query = base_query.where(Inventory.vendor_id == vendor_id)
-            count_query = count_query.where(Inventory.vendor_id == vendor_id)
+        filters = inventory_filters(product_id, vendor_id)
+        base_query = select(Inventory).options(*projection(Inventory, INVENTORY_LIST_FIELDS)).where(*filters)
+        count_query = select(func.count()).select_from(Inventory).where(*filters)
 
         # Get total count first
         total_result = await db.execute(count_query)
@@ -99,20 +124,7 @@ async def get_all_inventories(
         inventories = result.scalars().all()
 
         return {
-            "data": [
-                {
-                    "id": inv.id,
-                    "unit_price": inv.unit_price,
-                    "total_quantity": inv.total_quantity,
-                    "total_price": inv.total_price,
-                    "inventory_type": inv.inventory_type,
-                    "invoice_number": inv.invoice_number,
-                    "notes": inv.notes,
-                    "created_at": inv.created_at,
-                    "updated_at": inv.updated_at,
-                }
-                for inv in inventories
-            ],
+            "data": [pick(inv, INVENTORY_LIST_FIELDS) for inv in inventories],
             "meta": {
                 "total": total,
                 "page": page,
@@ -173,7 +185,6 @@ async def update_inventory(db: AsyncSession, inventory_id: int, data: InventoryS
         raise HTTPException(status_code=400, detail="Invalid inventory type")
         
     await db.commit()
-    await db.refresh(inventory)
     return inventory
 
 async def delete_inventory(db: AsyncSession, inventory_id: int):
@@ -17,7 +17,6 @@ async def create_notification(db: AsyncSession, notification: NotificationsSchem
         )
         db.add(db_notification)
         await db.commit()
-        await db.refresh(db_notification)
 
         if socket_manager:
             await socket_manager.emit(
@@ -104,7 +103,6 @@ async def mark_notification_as_read(db: AsyncSession, notification_id: int, sock
 
         notification.is_read = True
         await db.commit()
-        await db.refresh(notification)
 
         if socket_manager:
             await socket_manager.emit(
@@ -30,7 +30,6 @@ async def create_order_item(db: AsyncSession, order_item_data: OrderItemsSchema)
 
         db.add(new_order_item)
         await db.commit()
-        await db.refresh(new_order_item)
 
         return new_order_item
 
@@ -1,5 +1,6 @@
+from functools import lru_cache
 from typing import Optional
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, load_only
 from sqlalchemy import and_, func
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,7 +12,14 @@ from schemas.orders.orders import OrdersSchema
 from schemas.order_items.order_items import OrderItemsSchema
 from crud.notifications.notifications import create_notification
 from schemas.notifications.notifications import NotificationsSchema
-from utils.serializers.serialize_order import serialize_order_item, serialize_order
+from utils.serializers.serialize_order import (
+    serialize_order_item,
+    serialize_order,
+    order_item_product_option,
+    ORDER_ITEM_FIELDS,
+)
+from utils.projection import projection
+from utils.export import export_response, ExportFormat
 
 async def create_order_with_items(
     db: AsyncSession,
@@ -71,7 +79,6 @@ async def create_order_with_items(
         db_order.total_amount = total_amount + db_order.delivery_charge
 
         await db.commit()
-        await db.refresh(db_order)
 
         customer_notification = NotificationsSchema(
             user_id=db_order.user_id,
@@ -105,20 +112,26 @@ async def create_order_with_items(
 
 
 
+def order_query(order_id: int):
+    return select(Orders).where(Orders.id == order_id)
+
+
+def order_items_query(order_id: int):
+    return (
+        select(OrderItems)
+        .where(OrderItems.order_id == order_id)
+        .options(*projection(OrderItems, ORDER_ITEM_FIELDS, order_item_product_option()))
+    )
+
+
 async def get_order_with_items(db: AsyncSession, order_id: int):
     try:
-        result = await db.execute(
-            select(Orders).where(Orders.id == order_id)
-        )
+        result = await db.execute(order_query(order_id))
         order = result.scalar_one_or_none()
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
 
-        item_result = await db.execute(
-            select(OrderItems)
-            .where(OrderItems.order_id == order.id)
-            .options(selectinload(OrderItems.products))  
-        )
+        item_result = await db.execute(order_items_query(order.id))
         order_items = item_result.scalars().all()
 
         return {
@@ -162,7 +175,6 @@ async def update_order_status_fields(
             db_order.delivery_status = delivery_status
 
         await db.commit()
-        await db.refresh(db_order)
 
         notification = NotificationsSchema(
             user_id=db_order.user_id,
@@ -182,7 +194,7 @@ async def update_order_status_fields(
         items_result = await db.execute(
             select(OrderItems)
             .where(OrderItems.order_id == order_id)
-            .options(selectinload(OrderItems.products)) 
+            .options(*projection(OrderItems, ORDER_ITEM_FIELDS, order_item_product_option()))
             .offset(offset)
             .limit(limit)
         )
@@ -238,32 +250,75 @@ async def delete_order_with_items(db: AsyncSession, order_id: int):
         ) 
         
 
+# Loader options for the order listing. A `fields=` selection narrows the
+# order columns and skips the items query unless "order_items" is asked for.
+@lru_cache(maxsize=256)
+def order_list_options(fields: tuple = None):
+    items = selectinload(Orders.order_items).options(
+        load_only(*(getattr(OrderItems, name) for name in ORDER_ITEM_FIELDS)),
+        order_item_product_option(),
+    )
+    if fields is None:
+        return (items,)
+
+    columns = [name for name in fields if name != "order_items"]
+    relationships = [items] if "order_items" in fields else []
+    return tuple(projection(Orders, columns, *relationships))
+
+
+def order_filters(
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    delivery_status: Optional[str] = None,
+):
+    filters = []
+
+    if user_id is not None:
+        filters.append(Orders.user_id == user_id)
+    if status is not None:
+        filters.append(Orders.status == status)
+    if delivery_status is not None:
+        filters.append(Orders.delivery_status == delivery_status)
+    return filters
+
+
+def export_orders(
+    export_format: ExportFormat,
+    after_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    delivery_status: Optional[str] = None,
+):
+    query = select(Orders).options(*order_list_options()).where(
+        *order_filters(user_id, status, delivery_status)
+    )
+    return export_response(
+        query,
+        Orders.id,
+        lambda order: {
+            **serialize_order(order),
+            "order_items": [serialize_order_item(item) for item in order.order_items],
+        },
+        export_format,
+        "orders",
+        after_id,
+    )
+
+
 async def get_orders_with_optional_filters(
     db: AsyncSession,
     user_id: Optional[int] = None,
     status: Optional[str] = None,
     delivery_status: Optional[str] = None,
     page: int = 1,
-    limit: int = 30
+    limit: int = 30,
+    fields: Optional[tuple] = None,
 ):
     try:
         offset = (page - 1) * limit
-        filters = []
+        filters = order_filters(user_id, status, delivery_status)
 
-        if user_id is not None:
-            filters.append(Orders.user_id == user_id)
-        if status is not None:
-            filters.append(Orders.status == status)
-        if delivery_status is not None:
-            filters.append(Orders.delivery_status == delivery_status)
-
-        base_query = (
-            select(Orders)
-            .options(
-                selectinload(Orders.order_items)
-                .selectinload(OrderItems.products)
-            )
-        )
+        base_query = select(Orders).options(*order_list_options(fields))
 
         if filters:
             base_query = base_query.where(and_(*filters))
@@ -277,12 +332,15 @@ async def get_orders_with_optional_filters(
         )
         orders = result.scalars().all()
 
+        order_fields = None if fields is None else tuple(name for name in fields if name != "order_items")
+        with_items = fields is None or "order_items" in fields
+
         response_data = []
         for order in orders:
-            response_data.append({
-                "order": serialize_order(order),
-                "order_items": [serialize_order_item(item) for item in order.order_items]
-            })
+            entry = {"order": serialize_order(order, order_fields)}
+            if with_items:
+                entry["order_items"] = [serialize_order_item(item) for item in order.order_items]
+            response_data.append(entry)
 
         return {
             "data": response_data,
@@ -15,7 +15,6 @@ async def create_payment_method(db: AsyncSession, payment_method: PaymentMethodS
         )
         db.add(db_payment_method)
         await db.commit()
-        await db.refresh(db_payment_method)
         return db_payment_method
     except SQLAlchemyError as e:
         await db.rollback()
@@ -80,7 +79,6 @@ async def update_payment_method(db: AsyncSession, payment_method_id: int, paymen
         db_payment_method.is_active = payment_method.is_active
 
         await db.commit()
-        await db.refresh(db_payment_method)
         return db_payment_method
     except SQLAlchemyError as e:
         await db.rollback()
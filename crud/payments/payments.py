@@ -19,7 +19,6 @@ async def create_payment(db: AsyncSession, payment: PaymentsSchema):
     )
         db.add(db_payment)
         await db.commit()
-        await db.refresh(db_payment)
         return db_payment
     except SQLAlchemyError as e:
         await db.rollback()
@@ -8,6 +8,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from models.product_features.product_features import ProductFeatures
 from schemas.product_features.product_features import ProductFeaturesSchema
 from sqlalchemy.orm import selectinload
+from utils.feature_filters import refresh_feature_products
 
 
 async def get_product_feature_by_id(db: AsyncSession, id: int):
@@ -102,7 +103,6 @@ async def create_product_feature(db: AsyncSession, feature: ProductFeaturesSchem
         )
         db.add(new_feature)
         await db.commit()
-        await db.refresh(new_feature)
 
         return new_feature
 
@@ -132,8 +132,8 @@ async def update_product_feature(db: AsyncSession, id: int, feature: ProductFeat
         db_feature.value = feature.value
         db_feature.is_active = feature.is_active
 
+        await refresh_feature_products(db, id)
         await db.commit()
-        await db.refresh(db_feature)
 
         return db_feature
 
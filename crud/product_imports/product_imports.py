@@ -0,0 +1,348 @@
+import csv
+import io
+import json
+import logging
+import anyio
+from enum import Enum
+from typing import Optional
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import text, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.db import engine
+from models.product_imports.product_imports import ProductImports, ProductImportRows
+from utils.slug import slug_base
+from utils.feed_cache import invalidate_feed
+from utils.save_files import UPLOAD_DIR
+from config import settings
+
+# Bulk product import. The upload is COPY'd into product_import_rows as text,
+# then a background job validates, slugs and prices the rows with set based
+# statements and merges them into products IMPORT_CHUNK_SIZE rows at a time,
+# committing progress on the job after every chunk. Rows that fail keep
+# their error and are reported on the job; the rest are imported.
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    jsonl = "jsonl"
+
+
+IMPORT_COLUMNS = (
+    "name", "description", "meta_title", "meta_description", "price", "discount_type",
+    "discount_amount", "is_active", "sub_category_id", "brand_id", "vendor_id",
+    "highlighted_image", "images",
+)
+
+NUMBER = "'^[0-9]+(\\.[0-9]+)?$'"
+INTEGER = "'^[0-9]{1,9}$'"
+
+# Validation, in order: a row gets the first error that applies to it.
+# Casts are guarded by CASE since Postgres does not promise to evaluate the
+# "error IS NULL" condition first.
+ROW_CHECKS = (
+    ("name is required", "coalesce(trim(r.name), '') = ''"),
+    ("name is longer than 255 characters", "char_length(r.name) > 255"),
+    ("name must contain letters or digits", "coalesce(r.slug_base, '') = ''"),
+    ("description is longer than 511 characters", "char_length(r.description) > 511"),
+    ("meta_title is longer than 255 characters", "char_length(r.meta_title) > 255"),
+    ("meta_description is longer than 511 characters", "char_length(r.meta_description) > 511"),
+    ("price must be a non-negative number", f"r.price IS NULL OR r.price !~ {NUMBER}"),
+    ("discount_type must be fixed or percentage", "r.discount_type IS NULL OR r.discount_type NOT IN ('fixed', 'percentage')"),
+    ("discount_amount must be a non-negative number", f"r.discount_amount IS NOT NULL AND r.discount_amount !~ {NUMBER}"),
+    ("is_active must be true or false", "r.is_active IS NOT NULL AND lower(r.is_active) NOT IN ('true', 'false', '1', '0')"),
+    ("sub_category_id must be an integer", f"r.sub_category_id IS NULL OR r.sub_category_id !~ {INTEGER}"),
+    ("brand_id must be an integer", f"r.brand_id IS NULL OR r.brand_id !~ {INTEGER}"),
+    ("vendor_id must be an integer", f"r.vendor_id IS NULL OR r.vendor_id !~ {INTEGER}"),
+    (
+        "sub_category_id does not exist",
+        f"NOT EXISTS (SELECT 1 FROM sub_categories t WHERE t.id = CASE WHEN r.sub_category_id ~ {INTEGER} THEN r.sub_category_id::int END)",
+    ),
+    (
+        "brand_id does not exist",
+        f"NOT EXISTS (SELECT 1 FROM brands t WHERE t.id = CASE WHEN r.brand_id ~ {INTEGER} THEN r.brand_id::int END)",
+    ),
+    (
+        "vendor_id does not exist",
+        f"NOT EXISTS (SELECT 1 FROM vendors t WHERE t.id = CASE WHEN r.vendor_id ~ {INTEGER} THEN r.vendor_id::int END)",
+    ),
+)
+
+# Numbers the rows that have no slug yet after the highest base / base-N
+# already taken, by products or by the job's other rows, and after the rows
+# before them in the same import with the same base. The "base-" prefix is
+# matched as a ~>=~ / ~<~ range so the join can use ix_products_slug_pattern;
+# a LIKE whose pattern comes from the join cannot.
+ASSIGN_SLUGS = text("""
+    WITH bases AS (
+        SELECT DISTINCT slug_base FROM product_import_rows
+        WHERE job_id = :job_id AND error IS NULL AND slug IS NULL
+    ),
+    existing AS (
+        SELECT b.slug_base,
+               max(CASE WHEN t.slug = b.slug_base THEN 0
+                        ELSE substring(t.slug FROM char_length(b.slug_base) + 2)::bigint END) AS max_suffix
+        FROM bases b
+        JOIN (
+            SELECT slug FROM products
+            UNION ALL
+            SELECT slug FROM product_import_rows WHERE job_id = :job_id AND slug IS NOT NULL
+        ) t
+          ON t.slug = b.slug_base
+          OR (t.slug ~>=~ (b.slug_base || '-') AND t.slug ~<~ (b.slug_base || '.')
+              AND substring(t.slug FROM char_length(b.slug_base) + 2) ~ '^[0-9]{1,18}$')
+        GROUP BY b.slug_base
+    ),
+    numbered AS (
+        SELECT r.row_number,
+               r.slug_base,
+               coalesce(e.max_suffix, -1)
+                 + row_number() OVER (PARTITION BY r.slug_base ORDER BY r.row_number) AS suffix
+        FROM product_import_rows r
+        LEFT JOIN existing e ON e.slug_base = r.slug_base
+        WHERE r.job_id = :job_id AND r.error IS NULL AND r.slug IS NULL
+    )
+    UPDATE product_import_rows r
+    SET slug = CASE WHEN n.suffix = 0 THEN n.slug_base ELSE n.slug_base || '-' || n.suffix END
+    FROM numbered n
+    WHERE r.job_id = :job_id AND r.row_number = n.row_number
+""")
+
+# Different bases can still meet: "Foo", "Foo" and "Foo 1" number to foo,
+# foo-1 and foo-1. The first row keeps a slug, later rows with the same one
+# lose it and are numbered again by ASSIGN_SLUGS. Renumbered slugs always
+# carry a suffix above every taken one, so the second round settles it.
+RELEASE_DUPLICATE_SLUGS = text("""
+    WITH ranked AS (
+        SELECT row_number, row_number() OVER (PARTITION BY slug ORDER BY row_number) AS rank
+        FROM product_import_rows
+        WHERE job_id = :job_id AND slug IS NOT NULL
+    )
+    UPDATE product_import_rows r
+    SET slug = NULL
+    FROM ranked d
+    WHERE r.job_id = :job_id AND r.row_number = d.row_number AND d.rank > 1
+""")
+MAX_SLUG_ROUNDS = 5
+
+# payable_price is computed here with the same rules as calc_payable_price.
+# Slugs are unique within a job, so they map the inserted products back to
+# the row numbers that are returned.
+MERGE_CHUNK = text("""
+    WITH inserted AS (
+        INSERT INTO products (
+            name, slug, description, meta_title, meta_description, price, payable_price,
+            discount_type, discount_amount, is_active, sub_category_id, category_id, brand_id, vendor_id,
+            highlighted_image, images, total_stock, available_stock, quantity_sold
+        )
+        SELECT r.name, r.slug, r.description, r.meta_title, r.meta_description, v.price,
+               CASE
+                   WHEN r.discount_type = 'percentage' AND v.discount > 0 AND v.discount <= 100
+                       THEN v.price * (1 - v.discount / 100)
+                   WHEN r.discount_type = 'fixed' AND v.discount > 0 AND v.discount <= v.price
+                       THEN v.price - v.discount
+                   ELSE v.price
+               END,
+               CAST(r.discount_type AS discounttypeenum), v.discount,
+               coalesce(lower(r.is_active) IN ('true', '1'), true),
+               r.sub_category_id::int,
+               (SELECT sc.category_id FROM sub_categories sc WHERE sc.id = r.sub_category_id::int),
+               r.brand_id::int, r.vendor_id::int,
+               r.highlighted_image, coalesce(string_to_array(r.images, '|'), '{}'), 0, 0, 0
+        FROM product_import_rows r
+        CROSS JOIN LATERAL (
+            SELECT r.price::float8 AS price, coalesce(r.discount_amount::float8, 0) AS discount
+        ) v
+        WHERE r.job_id = :job_id AND r.error IS NULL AND r.row_number BETWEEN :first AND :last
+        ORDER BY r.row_number
+        ON CONFLICT (slug) DO NOTHING
+        RETURNING slug
+    )
+    SELECT r.row_number
+    FROM inserted i
+    JOIN product_import_rows r
+      ON r.job_id = :job_id AND r.row_number BETWEEN :first AND :last AND r.slug = i.slug
+""")
+
+
+# Imported image paths count as references to stored files (see
+# utils/file_refs.py); the merge bypasses the ORM, so it is done here.
+COUNT_FILE_REFS = text(f"""
+    INSERT INTO stored_files (path, ref_count)
+    SELECT refs.path, count(*)
+    FROM product_import_rows r
+    CROSS JOIN LATERAL unnest(
+        array_append(coalesce(string_to_array(r.images, '|'), '{{}}'), r.highlighted_image)
+    ) AS refs(path)
+    WHERE r.job_id = :job_id AND r.error IS NULL AND r.row_number BETWEEN :first AND :last
+      AND refs.path LIKE '{UPLOAD_DIR}%'
+    GROUP BY refs.path
+    ORDER BY refs.path
+    ON CONFLICT (path) DO UPDATE
+    SET ref_count = stored_files.ref_count + excluded.ref_count, updated_at = now()
+""")
+
+
+def cell(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, list):
+        value = "|".join(str(v) for v in value)
+    elif isinstance(value, bool):
+        value = "true" if value else "false"
+    value = str(value).strip()
+    return value or None
+
+
+def read_rows(file, import_format: ImportFormat):
+    stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if import_format == ImportFormat.csv:
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else {"__error__": "line is not a JSON object"}
+
+
+def staging_record(job_id: int, row_number: int, row: dict) -> tuple:
+    values = [cell(row.get(name)) for name in IMPORT_COLUMNS]
+    name = values[0]
+    return (job_id, row_number, *values, slug_base(name) if name else None, row.get("__error__"))
+
+
+# Parses the next IMPORT_CHUNK_SIZE rows; runs in a worker thread so a large
+# upload does not hold the event loop while it is decoded.
+def read_chunk(rows, job_id: int, first: int) -> list:
+    records = []
+    try:
+        for row_number, row in zip(range(first, first + settings.IMPORT_CHUNK_SIZE), rows):
+            records.append(staging_record(job_id, row_number, row))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read row {first + len(records)}: {e}")
+    return records
+
+
+async def create_import_job(db: AsyncSession, file: UploadFile, import_format: Optional[ImportFormat] = None):
+    if import_format is None:
+        filename = (file.filename or "").lower()
+        import_format = ImportFormat.jsonl if filename.endswith((".jsonl", ".ndjson")) else ImportFormat.csv
+
+    job = ProductImports(filename=file.filename, status="pending")
+    db.add(job)
+    await db.flush()
+
+    columns = ["job_id", "row_number", *IMPORT_COLUMNS, "slug_base", "error"]
+    connection = await (await db.connection()).get_raw_connection()
+    driver = connection.driver_connection
+
+    rows = read_rows(file.file, import_format)
+    total = 0
+    try:
+        while chunk := await anyio.to_thread.run_sync(read_chunk, rows, job.id, total + 1):
+            await driver.copy_records_to_table(ProductImportRows.__tablename__, records=chunk, columns=columns)
+            total += len(chunk)
+    except HTTPException:
+        await db.rollback()
+        raise
+
+    job.total_rows = total
+    await db.commit()
+    return job
+
+
+async def set_job(conn, job_id: int, **values):
+    await conn.execute(update(ProductImports).where(ProductImports.id == job_id).values(**values))
+
+
+# Runs as a background task, on its own connection so it can commit per chunk.
+async def run_import(job_id: int):
+    async with engine.connect() as conn:
+        try:
+            await set_job(conn, job_id, status="running")
+            for message, condition in ROW_CHECKS:
+                await conn.execute(
+                    text(f"UPDATE product_import_rows r SET error = :message "
+                         f"WHERE r.job_id = :job_id AND r.error IS NULL AND ({condition})"),
+                    {"message": message, "job_id": job_id},
+                )
+            for _ in range(MAX_SLUG_ROUNDS):
+                await conn.execute(ASSIGN_SLUGS, {"job_id": job_id})
+                if not (await conn.execute(RELEASE_DUPLICATE_SLUGS, {"job_id": job_id})).rowcount:
+                    break
+            await conn.commit()
+
+            total = (await conn.execute(
+                select(ProductImports.total_rows).where(ProductImports.id == job_id)
+            )).scalar_one()
+
+            imported = 0
+            for first in range(1, total + 1, settings.IMPORT_CHUNK_SIZE):
+                last = first + settings.IMPORT_CHUNK_SIZE - 1
+                params = {"job_id": job_id, "first": first, "last": last}
+                merged = (await conn.execute(MERGE_CHUNK, params)).scalars().all()
+                # Rows whose slug was taken by a concurrent insert since it was assigned.
+                await conn.execute(
+                    text("UPDATE product_import_rows SET error = 'slug was taken during the import, retry the row' "
+                         "WHERE job_id = :job_id AND error IS NULL AND row_number BETWEEN :first AND :last "
+                         "AND row_number <> ALL(:merged)"),
+                    {**params, "merged": list(merged)},
+                )
+                await conn.execute(COUNT_FILE_REFS, params)
+                imported += len(merged)
+                await set_job(conn, job_id, processed_rows=min(last, total), imported_rows=imported)
+                await conn.commit()
+
+            failed = (await conn.execute(
+                text("SELECT count(*) FROM product_import_rows WHERE job_id = :job_id AND error IS NOT NULL"),
+                {"job_id": job_id},
+            )).scalar_one()
+            errors = (await conn.execute(
+                text("SELECT row_number, error FROM product_import_rows "
+                     "WHERE job_id = :job_id AND error IS NOT NULL ORDER BY row_number LIMIT :limit"),
+                {"job_id": job_id, "limit": settings.IMPORT_MAX_ERRORS},
+            )).all()
+
+            await set_job(
+                conn,
+                job_id,
+                status="completed",
+                failed_rows=failed,
+                errors=[{"row": row, "error": error} for row, error in errors],
+            )
+            await conn.execute(delete(ProductImportRows).where(ProductImportRows.job_id == job_id))
+            await conn.commit()
+            if imported:
+                invalidate_feed("new_arrivals")
+
+        except Exception as e:
+            logging.exception(f"Product import {job_id} failed")
+            await conn.rollback()
+            await set_job(conn, job_id, status="failed", detail=str(e)[:511])
+            await conn.commit()
+
+
+async def get_import_job(db: AsyncSession, job_id: int):
+    result = await db.execute(select(ProductImports).where(ProductImports.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    return {
+        "id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "imported_rows": job.imported_rows,
+        "failed_rows": job.failed_rows,
+        "progress": round(job.processed_rows / job.total_rows * 100, 1) if job.total_rows else 100.0,
+        "errors": job.errors or [],
+        "detail": job.detail,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
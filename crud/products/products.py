@@ -4,11 +4,17 @@ from sqlalchemy.future import select
 from fastapi import HTTPException, status
 from models import *
 from schemas.products.products import ProductsSchema
-from utils.slug import generate_unique_slug
+from utils.slug import flush_with_unique_slug
 from typing import List, Optional
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import selectinload
 from utils.serializers.serialize_product import serialize_product
+from utils.projection import projection
+from utils.batch import fetch_batch
+from utils.export import export_response, ExportFormat
+from functools import lru_cache
+from utils.feed_cache import invalidate_feed
+from utils.feature_filters import features_condition, refresh_product_attributes
 
 
 def calc_payable_price(
@@ -23,6 +29,20 @@ def calc_payable_price(
     else:
         return price
 
+# Products.category_id is copied from the sub category. The row is share
+# locked until commit, so a concurrent move of the sub category (which
+# updates its products) cannot slip in between.
+async def sub_category_parent(db: AsyncSession, sub_category_id: int) -> int:
+    result = await db.execute(
+        select(SubCategories.category_id)
+        .where(SubCategories.id == sub_category_id)
+        .with_for_update(read=True)
+    )
+    category_id = result.scalar_one_or_none()
+    if category_id is None:
+        raise HTTPException(status_code=404, detail="Sub category not found")
+    return category_id
+
 # This function creates a new product in the database with the provided data.
 async def create_product(
     db: AsyncSession,
@@ -31,8 +51,6 @@ async def create_product(
     image_paths: Optional[List[str]] = None
 ):
     try:
-        new_slug = await generate_unique_slug(db, product_data.name, Products)
-
         payable_price = calc_payable_price(
             product_data.price,
             product_data.discount_type.value if product_data.discount_type else None,
@@ -55,9 +73,9 @@ async def create_product(
             payable_price=payable_price,
             discount_type=product_data.discount_type,
             discount_amount=product_data.discount_amount,
-            slug=new_slug,
             is_active=product_data.is_active,
             sub_category_id=product_data.sub_category_id,
+            category_id=await sub_category_parent(db, product_data.sub_category_id),
             brand_id=product_data.brand_id,
             vendor_id=product_data.vendor_id,
             highlighted_image=highlighted_image_path,
@@ -65,11 +83,15 @@ async def create_product(
             product_specific_features=features
         )
 
-        db.add(new_product)
+        await flush_with_unique_slug(db, new_product, product_data.name)
+        if features:
+            await refresh_product_attributes(db, [new_product.id])
         await db.commit()
-        await db.refresh(new_product)
+        invalidate_feed("new_arrivals")
         return new_product
 
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -78,34 +100,108 @@ async def create_product(
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
-async def get_product_by_id(db: AsyncSession, product_id: int):
-    result = await db.execute(
+def product_detail_query(product_id: int):
+    return (
         select(Products)
-        .options(
-            joinedload(Products.sub_categories),
-            joinedload(Products.product_specific_features)
-        )
+        .options(selectinload(Products.product_specific_features))
         .where(Products.id == product_id)
     )
+
+
+# Loader options for a `fields=` selection: the requested columns, and the
+# relationships only when a field needs them. Cached per field set.
+@lru_cache(maxsize=256)
+def product_list_options(fields: tuple = None):
+    if fields is None:
+        return (selectinload(Products.product_specific_features),)
+
+    relationships = []
+    if "product_specific_features" in fields:
+        relationships.append(selectinload(Products.product_specific_features))
+
+    columns = [name for name in fields if name not in ("product_specific_features", "image_variants")]
+    if "image_variants" in fields:
+        columns += [name for name in ("highlighted_image", "images") if name not in columns]
+    return tuple(projection(Products, columns, *relationships))
+
+
+def product_list_query(fields: tuple = None):
+    return select(Products).options(*product_list_options(fields))
+
+
+async def get_product_by_id(db: AsyncSession, product_id: int):
+    result = await db.execute(product_detail_query(product_id))
     product = result.unique().scalar_one_or_none()
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found.")
 
-    category_id = (
-        product.sub_categories.category_id
-        if product.sub_categories and product.sub_categories.category_id
-        else None
-    )
-
     return serialize_product(product)
 
 
+async def get_products_by_ids(db: AsyncSession, ids: tuple, fields: Optional[tuple] = None):
+    return await fetch_batch(
+        db,
+        product_list_query(fields),
+        Products.id,
+        ids,
+        lambda product: serialize_product(product, fields),
+    )
+
+
 def apply_product_filters(query, filters):
     for condition in filters:
         query = query.where(condition)
     return query
 
+# Conditions shared by the product listing and the product export.
+def product_filters(
+    is_active: Optional[bool] = None,
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    meta_title: Optional[str] = None,
+    meta_description: Optional[str] = None,
+    sub_category_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    brand_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+    discount_type: Optional[str] = None,
+    product_feature_name: Optional[str] = None,
+    features: Optional[dict] = None,
+):
+    filters = []
+
+    if is_active is not None:
+        filters.append(Products.is_active == is_active)
+    if name:
+        filters.append(Products.name.ilike(f"%{name}%"))
+    if description:
+        filters.append(Products.description.ilike(f"%{description}%"))
+    if meta_title:
+        filters.append(Products.meta_title.ilike(f"%{meta_title}%"))
+    if meta_description:
+        filters.append(Products.meta_description.ilike(f"%{meta_description}%"))
+    if sub_category_id:
+        filters.append(Products.sub_category_id == sub_category_id)
+    if category_id:
+        filters.append(Products.category_id == category_id)
+    if brand_id:
+        filters.append(Products.brand_id == brand_id)
+    if vendor_id:
+        filters.append(Products.vendor_id == vendor_id)
+    if discount_type:
+        filters.append(Products.discount_type == discount_type)
+    if product_feature_name:
+        filters.append(
+            Products.product_specific_features.any(
+                ProductFeatures.name.ilike(f"%{product_feature_name}%")
+            )
+        )
+    if features:
+        filters.extend(features_condition(Products.attributes, features))
+    return filters
+
+
 async def get_all_products(
     db: AsyncSession,
     page: int,
@@ -121,43 +217,25 @@ async def get_all_products(
     vendor_id: Optional[int] = None,
     discount_type: Optional[str] = None,
     product_feature_name: Optional[str] = None,
+    features: Optional[dict] = None,
+    fields: Optional[tuple] = None,
 ):
     try:
-        filters = []
-
-        if is_active is not None:
-            filters.append(Products.is_active == is_active)
-        if name:
-            filters.append(Products.name.ilike(f"%{name}%"))
-        if description:
-            filters.append(Products.description.ilike(f"%{description}%"))
-        if meta_title:
-            filters.append(Products.meta_title.ilike(f"%{meta_title}%"))
-        if meta_description:
-            filters.append(Products.meta_description.ilike(f"%{meta_description}%"))
-        if sub_category_id:
-            filters.append(Products.sub_category_id == sub_category_id)
-        if category_id:
-            filters.append(Products.sub_categories.has(SubCategories.category_id == category_id))
-        if brand_id:
-            filters.append(Products.brand_id == brand_id)
-        if vendor_id:
-            filters.append(Products.vendor_id == vendor_id)
-        if discount_type:
-            filters.append(Products.discount_type == discount_type)
-        if product_feature_name:
-            filters.append(
-                Products.product_specific_features.any(
-                    ProductFeatures.name.ilike(f"%{product_feature_name}%")
-                )
-            )
-
-        query = select(Products).options(
-            joinedload(Products.sub_categories),
-            selectinload(Products.product_specific_features)
+        filters = product_filters(
+            is_active=is_active,
+            name=name,
+            description=description,
+            meta_title=meta_title,
+            meta_description=meta_description,
+            sub_category_id=sub_category_id,
+            category_id=category_id,
+            brand_id=brand_id,
+            vendor_id=vendor_id,
+            discount_type=discount_type,
+            product_feature_name=product_feature_name,
+            features=features,
         )
-
-        query = apply_product_filters(query, filters)
+        query = apply_product_filters(product_list_query(fields), filters)
 
         total_query = select(func.count()).select_from(query.subquery())
         total_result = await db.execute(total_query)
@@ -167,15 +245,7 @@ async def get_all_products(
         result = await db.execute(query.offset(offset).limit(limit))
         products = result.unique().scalars().all()
 
-        data = []
-        for product in products:
-            category_id_value = (
-                product.sub_categories.category_id
-                if product.sub_categories and product.sub_categories.category_id
-                else None
-            )
-
-            data.append(serialize_product(product))
+        data = [serialize_product(product, fields) for product in products]
 
         return {
             "data": data,
@@ -191,22 +261,33 @@ async def get_all_products(
         raise HTTPException(status_code=500, detail=f"Error retrieving products: {str(e)}")
 
 
+def export_products(
+    export_format: ExportFormat,
+    after_id: Optional[int] = None,
+    fields: Optional[tuple] = None,
+    **filter_args,
+):
+    query = apply_product_filters(product_list_query(fields), product_filters(**filter_args))
+    return export_response(
+        query,
+        Products.id,
+        lambda product: serialize_product(product, fields),
+        export_format,
+        "products",
+        after_id,
+    )
+
+
 async def get_products_by_vendor_id(
     db: AsyncSession,
     vendor_id: int,
     page: int,
     limit: int,
-    is_active: Optional[bool] = None
+    is_active: Optional[bool] = None,
+    fields: Optional[tuple] = None,
 ):
     try:
-        query = (
-            select(Products)
-            .options(
-                joinedload(Products.sub_categories),
-                joinedload(Products.product_specific_features)
-            )
-            .where(Products.vendor_id == vendor_id)
-        )
+        query = product_list_query(fields).where(Products.vendor_id == vendor_id)
 
         if is_active is not None:
             query = query.where(Products.is_active == is_active)
@@ -218,15 +299,7 @@ async def get_products_by_vendor_id(
         result = await db.execute(query.offset((page - 1) * limit).limit(limit))
         products = result.unique().scalars().all()
 
-        data = []
-        for product in products:
-            category_id = (
-                product.sub_categories.category_id
-                if product.sub_categories and product.sub_categories.category_id
-                else None
-            )
-
-            data.append(serialize_product(product))
+        data = [serialize_product(product, fields) for product in products]
 
         return {
             "data": data,
@@ -253,7 +326,7 @@ async def update_product_by_vendor_id(
         result = await db.execute(
             select(Products)
             .where(Products.id == product_id)
-            .options(joinedload(Products.product_specific_features))
+            .options(selectinload(Products.product_specific_features))
         )
         product = result.scalar_one_or_none()
 
@@ -266,9 +339,7 @@ async def update_product_by_vendor_id(
                 detail="You are not authorized to update this product"
             )
 
-        if product.name != product_data.name:
-            product.slug = await generate_unique_slug(db, product_data.name, Products)
-
+        renamed = product.name != product_data.name
 
         payable_price = calc_payable_price(
             product_data.price,
@@ -285,6 +356,8 @@ async def update_product_by_vendor_id(
         product.discount_type = product_data.discount_type
         product.discount_amount = product_data.discount_amount
         product.is_active = product_data.is_active
+        if product.sub_category_id != product_data.sub_category_id:
+            product.category_id = await sub_category_parent(db, product_data.sub_category_id)
         product.sub_category_id = product_data.sub_category_id
         product.brand_id = product_data.brand_id
 
@@ -300,10 +373,16 @@ async def update_product_by_vendor_id(
             product.product_specific_features.clear()  
             product.product_specific_features = result.scalars().all()
 
+        if renamed:
+            await flush_with_unique_slug(db, product, product_data.name)
+        if product_data.product_specific_features is not None:
+            await refresh_product_attributes(db, [product.id])
         await db.commit()
-        await db.refresh(product)
+        invalidate_feed("new_arrivals")
         return product
 
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -323,16 +402,14 @@ async def update_product_by_id(
         result = await db.execute(
             select(Products)
             .where(Products.id == product_id)
-            .options(joinedload(Products.product_specific_features))
+            .options(selectinload(Products.product_specific_features))
         )
         product = result.scalar_one_or_none()
 
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
 
-        if product.name != product_data.name:
-            product.slug = await generate_unique_slug(db, product_data.name, Products)
-
+        renamed = product.name != product_data.name
 
         payable_price = calc_payable_price(
             product_data.price,
@@ -349,6 +426,8 @@ async def update_product_by_id(
         product.discount_type = product_data.discount_type
         product.discount_amount = product_data.discount_amount
         product.is_active = product_data.is_active
+        if product.sub_category_id != product_data.sub_category_id:
+            product.category_id = await sub_category_parent(db, product_data.sub_category_id)
         product.sub_category_id = product_data.sub_category_id
         product.brand_id = product_data.brand_id
         product.vendor_id = product_data.vendor_id
@@ -365,10 +444,16 @@ async def update_product_by_id(
             product.product_specific_features.clear()  
             product.product_specific_features = result.scalars().all()
 
+        if renamed:
+            await flush_with_unique_slug(db, product, product_data.name)
+        if product_data.product_specific_features is not None:
+            await refresh_product_attributes(db, [product.id])
         await db.commit()
-        await db.refresh(product)
+        invalidate_feed("new_arrivals")
         return product
 
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
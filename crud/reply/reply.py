@@ -15,7 +15,6 @@ async def create_reply(db: AsyncSession, reply: ReplySchema):
         )
         db.add(db_reply)
         await db.commit()
-        await db.refresh(db_reply)
         return db_reply
     except SQLAlchemyError as e:
         await db.rollback()
@@ -59,7 +58,6 @@ async def update_reply(db: AsyncSession, reply_id: int, updated_data: ReplySchem
             db_reply.is_active = updated_data.is_active
 
         await db.commit()
-        await db.refresh(db_reply)
         return db_reply
     except SQLAlchemyError as e:
         await db.rollback()
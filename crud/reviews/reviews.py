@@ -24,7 +24,6 @@ async def create_review(db: AsyncSession, review_data: ReviewsSchema, image_url:
     )
     db.add(new_review)
     await db.commit()
-    await db.refresh(new_review)
     return new_review
 
 
@@ -61,7 +60,6 @@ async def update_review(db: AsyncSession, review_id: int, review_data: ReviewsSc
     existing_review.is_active = review_data.is_active
 
     await db.commit()
-    await db.refresh(existing_review)
 
     return existing_review
 
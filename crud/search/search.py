@@ -40,7 +40,7 @@ async def search_products(
     if brand_id:
         query = query.where(Products.brand_id == brand_id)
     if subcategory_id:
-        query = query.where(Products.subcategory_id == subcategory_id)
+        query = query.where(Products.sub_category_id == subcategory_id)
     if min_price is not None:
         query = query.where(Products.payable_price >= min_price)
     if max_price is not None:
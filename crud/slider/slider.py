@@ -2,11 +2,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException, status
 from models.slider.slider import Sliders
+from models import SliderType, Vendors, Categories, SubCategories
 from schemas.slider.slider import SlidersSchema, UpdateSlidersSchema
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select, func
 from typing import Optional
+from utils.feed_cache import invalidate_feed
+
+
+# Relationship loads for the slider list; each related row is narrowed to
+# the fields the list serializes.
+def slider_list_options():
+    return [
+        selectinload(Sliders.slider_type).load_only(
+            SliderType.type, SliderType.description, SliderType.rate,
+            SliderType.height, SliderType.width, SliderType.is_active,
+        ),
+        selectinload(Sliders.vendors)
+        .load_only(Vendors.user_id, Vendors.store_name, Vendors.is_active)
+        .raiseload("*"),
+        selectinload(Sliders.payments).raiseload("*"),
+        selectinload(Sliders.categories).load_only(Categories.name).raiseload("*"),
+        selectinload(Sliders.sub_categories).load_only(SubCategories.name).raiseload("*"),
+    ]
 
 #Create Sliders
 async def create_slider(
@@ -36,7 +55,7 @@ async def create_slider(
 
         db.add(new_slider)
         await db.commit()
-        await db.refresh(new_slider)
+        invalidate_feed("sliders")
 
         return new_slider
 
@@ -58,13 +77,7 @@ async def get_all_sliders(
     page = max(page, 1)
     limit = max(limit, 1)
     offset = (page - 1) * limit
-    query = select(Sliders).options(
-        selectinload(Sliders.slider_type),
-        selectinload(Sliders.vendors),
-        selectinload(Sliders.payments),
-        selectinload(Sliders.categories),
-        selectinload(Sliders.sub_categories)
-    )
+    query = select(Sliders).options(*slider_list_options())
     if is_active is not None:
         query = query.where(Sliders.is_active == is_active)
 
@@ -153,11 +166,7 @@ async def get_sliders_by_slider_type_id(db: AsyncSession, slider_type_id: int, p
     offset = (page - 1) * limit
 
     query = select(Sliders).where(Sliders.slider_type_id == slider_type_id).options(
-        selectinload(Sliders.slider_type),
-        selectinload(Sliders.vendors),
-        selectinload(Sliders.payments),
-        selectinload(Sliders.categories),
-        selectinload(Sliders.sub_categories)
+        selectinload(Sliders.slider_type).load_only(SliderType.type, SliderType.description)
     )
 
     total_result = await db.execute(select(func.count()).select_from(query.subquery()))
@@ -245,7 +254,7 @@ async def update_slider(
             db_slider.image = filePath
 
         await db.commit()
-        await db.refresh(db_slider)
+        invalidate_feed("sliders")
 
         return db_slider
 
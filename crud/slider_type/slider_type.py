@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, select
 from models.slider_type.slider_type import SliderType
 from schemas.slider_type.slider_type import SliderTypeSchema
+from utils.feed_cache import invalidate_feed
 
 async def create_slider_type(
     db: AsyncSession,
@@ -21,7 +22,6 @@ async def create_slider_type(
 
         db.add(new_slider)
         await db.commit()
-        await db.refresh(new_slider)
 
         return new_slider
 
@@ -116,7 +116,7 @@ async def update_slider_type(
         db_slider_type.is_active = slider_data.is_active
 
         await db.commit()
-        await db.refresh(db_slider_type)
+        invalidate_feed("sliders")
 
         return db_slider_type
 
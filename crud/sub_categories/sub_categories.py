@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import func
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
@@ -10,6 +10,7 @@ from models import *
 from schemas.sub_categories.sub_categories import SubCategoriesSchema
 from models.product_features.product_features import ProductFeatures
 from sqlalchemy.orm import joinedload
+from utils.feed_cache import invalidate_feed
 
 
 async def get_sub_category_by_id(db: AsyncSession, id: int):
@@ -146,7 +147,7 @@ async def create_sub_category(
 
         db.add(new_sub_category)
         await db.commit()
-        await db.refresh(new_sub_category)
+        invalidate_feed("categories")
         return serialize_sub_category(new_sub_category)
 
     except SQLAlchemyError as e:
@@ -167,10 +168,20 @@ async def update_sub_category(
         if not db_sub_category:
             raise HTTPException(status_code=404, detail="Sub Category not found")
 
+        moved = "category_id" in update_data and update_data["category_id"] != db_sub_category.category_id
+
         for field, value in update_data.items():
             if field != "features_id":
                 setattr(db_sub_category, field, value)
 
+        # Products carry a copy of their sub category's category_id.
+        if moved:
+            await db.execute(
+                update(Products)
+                .where(Products.sub_category_id == id)
+                .values(category_id=update_data["category_id"])
+            )
+
         if "features_id" in update_data:
             feature_query = await db.execute(
                 select(ProductFeatures).where(ProductFeatures.id.in_(update_data["features_id"]))
@@ -181,7 +192,7 @@ async def update_sub_category(
             db_sub_category.image = file_path
 
         await db.commit()
-        await db.refresh(db_sub_category)
+        invalidate_feed("categories", "sliders")
 
         return serialize_sub_category(db_sub_category)
 
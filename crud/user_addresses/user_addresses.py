@@ -16,7 +16,6 @@ async def create_user_address(db: AsyncSession, address_data: UserAddressesSchem
     )
     db.add(new_address)
     await db.commit()
-    await db.refresh(new_address)
     return new_address
 
 
@@ -52,7 +51,6 @@ async def update_user_address(
         address.is_default = updated_data.is_default
 
         await db.commit()
-        await db.refresh(address)
 
     return address
 
@@ -9,6 +9,8 @@ from sqlalchemy import or_, and_
 from datetime import datetime
 from typing import Optional
 from sqlalchemy import func
+from utils.batch import fetch_batch
+from utils.export import export_response, ExportFormat
 
 
 async def get_user(db: AsyncSession, id: int):
@@ -21,21 +23,17 @@ async def get_user(db: AsyncSession, id: int):
     return serialize_user(db_user)
 
 
-async def get_users(
-    db: AsyncSession,
-    page: int,
-    limit: int,
+async def get_users_by_ids(db: AsyncSession, ids: tuple):
+    return await fetch_batch(db, select(Users), Users.id, ids, serialize_user)
+
+
+def user_filters(
     search: Optional[str] = None,
     user_id: Optional[int] = None,
     status: Optional[bool] = None,
     created_from: Optional[datetime] = None,
     created_to: Optional[datetime] = None,
-    sort_by: str = "created_at",
-    sort_order: str = "desc"
 ):
-    offset = (page - 1) * limit
-    base_query = select(Users)
-
     filters = []
     if user_id:
         filters.append(Users.id == user_id)
@@ -53,7 +51,39 @@ async def get_users(
                 Users.phone.ilike(f"%{search}%")
             )
         )
-    
+    return filters
+
+
+def export_users(
+    export_format: ExportFormat,
+    after_id: Optional[int] = None,
+    search: Optional[str] = None,
+    user_id: Optional[int] = None,
+    status: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    query = select(Users).where(*user_filters(search, user_id, status, created_from, created_to))
+    return export_response(query, Users.id, serialize_user, export_format, "users", after_id)
+
+
+async def get_users(
+    db: AsyncSession,
+    page: int,
+    limit: int,
+    search: Optional[str] = None,
+    user_id: Optional[int] = None,
+    status: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort_by: str = "created_at",
+    sort_order: str = "desc"
+):
+    offset = (page - 1) * limit
+    base_query = select(Users)
+
+    filters = user_filters(search, user_id, status, created_from, created_to)
+
     if filters:
         base_query = base_query.where(and_(*filters))
 
@@ -111,7 +141,6 @@ async def update_user(
             db_user.image = filePath
 
         await db.commit()
-        await db.refresh(db_user)
 
         return serialize_user(db_user)
 
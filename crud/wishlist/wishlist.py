@@ -3,9 +3,40 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException, status
 from models.wishlist.wishlist import Wishlist
+from models.products.products import Products
 from schemas.wishlist.wishlist import WishlistSchema
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
+from typing import Optional
+from functools import lru_cache
+from utils.projection import projection
+
+# Wishlist output fields read from the product, with the column behind each.
+WISHLIST_PRODUCT_FIELDS = {"name": "name", "price": "payable_price", "image": "highlighted_image"}
+WISHLIST_FIELDS = ("id", "product_id", "name", "price", "image", "created_at")
+
+
+# The product join is skipped when no product field is requested.
+@lru_cache(maxsize=256)
+def wishlist_list_options(fields: tuple):
+    product_columns = [
+        getattr(Products, WISHLIST_PRODUCT_FIELDS[name]) for name in fields if name in WISHLIST_PRODUCT_FIELDS
+    ]
+    relationships = []
+    if product_columns:
+        relationships.append(joinedload(Wishlist.products).load_only(*product_columns).raiseload("*"))
+    columns = [name for name in fields if name not in WISHLIST_PRODUCT_FIELDS]
+    return tuple(projection(Wishlist, columns, *relationships))
+
+def wishlist_item_fields(item: Wishlist, fields: tuple) -> dict:
+    data = {}
+    for name in fields:
+        if name in WISHLIST_PRODUCT_FIELDS:
+            data[name] = getattr(item.products, WISHLIST_PRODUCT_FIELDS[name]) if item.products else None
+        else:
+            data[name] = getattr(item, name)
+    return data
+
 
 #Create Wishlist
 async def create_wishlist(
@@ -19,7 +50,6 @@ async def create_wishlist(
         )
         db.add(new_item)
         await db.commit()
-        await db.refresh(new_item)
         return new_item
 
     except SQLAlchemyError as e:
@@ -35,14 +65,16 @@ async def get_wishlists_by_user_id(
     db: AsyncSession,
     user_id: int,
     page: int = 1,
-    limit: int = 30
+    limit: int = 30,
+    fields: Optional[tuple] = None,
 ):
     try:
         offset = (page - 1) * limit
 
+        fields = fields or WISHLIST_FIELDS
         base_query = (
             select(Wishlist)
-            .options(joinedload(Wishlist.products))
+            .options(*wishlist_list_options(fields))
             .where(Wishlist.user_id == user_id)
         )
 
@@ -55,17 +87,7 @@ async def get_wishlists_by_user_id(
         result = await db.execute(base_query.offset(offset).limit(limit))
         wishlists = result.scalars().all()
 
-        data = [
-            {
-                "id": item.id,
-                "product_id": item.product_id,
-                "name": item.products.name if item.products else None,
-                "price": item.products.payable_price if item.products else None,
-                "image": item.products.highlighted_image if item.products else None,
-                "created_at": item.created_at,
-            }
-            for item in wishlists
-        ]
+        data = [wishlist_item_fields(item, fields) for item in wishlists]
 
         return {
             "data": data,
@@ -1,19 +1,132 @@
+import asyncio
+import itertools
+import logging
+from fastapi import Request
+from sqlalchemy import event, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from database.db_url import SQLALCHEMY_DATABASE_URL
+from database.read_routing import recently_wrote
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
+from config import settings
 
 class Base(AsyncAttrs, DeclarativeBase):
-    pass
+    # Server-generated columns (ids, created_at/updated_at) come back through
+    # INSERT/UPDATE ... RETURNING, so writes never need a refresh SELECT.
+    __mapper_args__ = {"eager_defaults": True}
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+
+_unset_columns = {}
+
+
+# Without a refresh, a nullable column the constructor left out stays
+# unloaded after the INSERT: it would be missing from ORM objects returned
+# as JSON (a refresh used to load it as null) and reading it would lazy load.
+# Columns with no default start out as None instead, which is what the
+# INSERT stores anyway.
+@event.listens_for(Base, "init", propagate=True)
+def load_unset_columns(target, args, kwargs):
+    cls = type(target)
+    keys = _unset_columns.get(cls)
+    if keys is None:
+        keys = _unset_columns[cls] = [
+            prop.key
+            for prop in inspect(cls).column_attrs
+            if len(prop.columns) == 1
+            and (column := prop.columns[0]).nullable
+            and not column.primary_key
+            and column.default is None
+            and column.server_default is None
+        ]
+    for key in keys:
+        if key not in kwargs:
+            setattr(target, key, None)
+
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
+replica_urls = [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()]
+# The replica pool budget is shared, so adding a replica spreads the same
+# number of connections thinner instead of multiplying them.
+replica_engines = [
+    create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        pool_size=max(1, settings.DB_REPLICA_POOL_SIZE // len(replica_urls)),
+        max_overflow=settings.DB_REPLICA_MAX_OVERFLOW // len(replica_urls),
+    )
+    for url in replica_urls
+]
+ReplicaSessions = [
+    sessionmaker(bind=replica, class_=AsyncSession, expire_on_commit=False)
+    for replica in replica_engines
+]
+replica_healthy = [True] * len(replica_engines)
+_replica_cursor = itertools.count()
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+# Round-robin over healthy replicas; None when there is nothing to use.
+def pick_replica():
+    count = len(ReplicaSessions)
+    for _ in range(count):
+        index = next(_replica_cursor) % count
+        if replica_healthy[index]:
+            return ReplicaSessions[index]
+    return None
+
+
+# Session for read-only endpoints. Falls back to the primary when no replica
+# is configured or healthy, and for clients that wrote a moment ago.
+async def get_read_db(request: Request):
+    session_factory = None
+    if not recently_wrote(request.cookies):
+        session_factory = pick_replica()
+
+    async with (session_factory or AsyncSessionLocal)() as session:
+        yield session
+
+
+# Read session outside a request (aggregate and background reads).
+def read_session() -> AsyncSession:
+    return (pick_replica() or AsyncSessionLocal)()
+
+
+async def check_replica(index: int) -> bool:
+    try:
+        async def ping():
+            async with replica_engines[index].connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.wait_for(ping(), timeout=settings.HEALTH_DB_TIMEOUT_SECONDS)
+        return True
+    except Exception as e:
+        logging.warning(f"Read replica {index} failed health check: {e}")
+        return False
+
+
+async def monitor_replicas(interval: float = settings.DB_REPLICA_CHECK_SECONDS):
+    while replica_engines:
+        results = await asyncio.gather(*(check_replica(i) for i in range(len(replica_engines))))
+        replica_healthy[:] = results
+        await asyncio.sleep(interval)
+
+
+async def dispose_engines():
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
@@ -0,0 +1,42 @@
+import time
+from config import settings
+
+# Read-your-writes stickiness. A successful write stamps the client with a
+# short-lived cookie; while it is valid get_read_db hands out primary sessions
+# so the client never reads a replica that has not caught up with its write.
+# The cookie travels with the client, so it works across workers and hosts.
+
+STICKY_COOKIE = "read_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+# The cookie is client controlled, so only a deadline inside the window a
+# real write would have set is honoured; anything further out is ignored
+# rather than pinning the client (or a script) to the primary.
+def recently_wrote(cookies: dict, window: int = settings.DB_READ_YOUR_WRITES_SECONDS) -> bool:
+    try:
+        until = float(cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    now = time.time()
+    return now < until <= now + window
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app, window: int = settings.DB_READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = int(time.time()) + self.window
+                cookie = f"{STICKY_COOKIE}={until}; Max-Age={self.window}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
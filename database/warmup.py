@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import configure_mappers
+from config import settings
+from crud.products.products import product_detail_query, product_list_query
+from crud.orders.orders import order_query, order_items_query
+from models import *
+
+# Readiness flag for the probes: "done" flips once warmup has succeeded;
+# until then "error" holds the last failure and warmup keeps retrying.
+warmup_state = {
+    "done": False,
+    "error": None,
+    "attempts": 0,
+    "connections": 0,
+    "duration_ms": None,
+}
+
+WARMUP_RETRY_INITIAL_SECONDS = 0.5
+WARMUP_RETRY_MAX_SECONDS = 30.0
+
+# Hot statements run once per pre-opened connection. Executing them fills the
+# engine's compiled cache and asyncpg's per-connection prepared statements;
+# the bound ids match nothing so the queries stay cheap.
+HOT_STATEMENTS = [
+    lambda: product_list_query().offset(0).limit(1),
+    lambda: product_detail_query(-1),
+    lambda: order_query(-1),
+    lambda: order_items_query(-1),
+]
+
+
+def is_warm() -> bool:
+    return warmup_state["done"] and warmup_state["error"] is None
+
+
+async def warm_connection(engine: AsyncEngine, barrier: asyncio.Barrier):
+    try:
+        async with engine.connect() as conn:
+            async with AsyncSession(bind=conn) as session:
+                for build in HOT_STATEMENTS:
+                    result = await session.execute(build())
+                    result.unique().scalars().all()
+
+            # Hold the connection until every task has one, otherwise the
+            # pool hands the same connection back and only one gets opened.
+            await barrier.wait()
+    except Exception:
+        await barrier.abort()
+        raise
+
+
+async def warmup_once(engine: AsyncEngine):
+    configure_mappers()
+    target = max(1, min(settings.DB_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE))
+    barrier = asyncio.Barrier(target)
+    await asyncio.gather(*(warm_connection(engine, barrier) for _ in range(target)))
+    warmup_state["connections"] = target
+
+
+# A database that is briefly unreachable at boot must not leave the pod
+# unready for good, so failures are retried with capped exponential backoff.
+async def warmup(engine: AsyncEngine):
+    started = time.perf_counter()
+    delay = WARMUP_RETRY_INITIAL_SECONDS
+    while True:
+        warmup_state["attempts"] += 1
+        try:
+            await warmup_once(engine)
+            break
+        except Exception as e:
+            warmup_state["error"] = str(e)
+            logging.error(f"Warmup attempt {warmup_state['attempts']} failed, retrying in {delay}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+    warmup_state["error"] = None
+    warmup_state["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    warmup_state["done"] = True
+    logging.info(f"Warmup finished: {warmup_state}")
@@ -1,84 +1,133 @@
+import asyncio
+import importlib
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from database.db import Base, engine
-from routes.auth import registration, login
-from routes.auth import oauth
+from database.db import Base, engine, replica_engines, monitor_replicas, dispose_engines
+from database.read_routing import ReadYourWritesMiddleware
+from database.warmup import warmup
+from utils.health import monitor_loop_lag
+from utils.load_shedding import ConcurrencyLimitMiddleware
+from utils.compression import CompressionMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from routes.users import users
-from routes.categories import categories
-from routes.sub_categories import sub_categories
-from routes.auth import password
-from routes.brands import brands
-from routes.vendor import vendors
-from routes.bank_details import bank_details
-from routes.best_seller import best_seller
-from routes.product_features import product_features
-from routes.products import products
-from routes.wishlist import wishlist
-from routes.cart_items import cart_items
-from routes.cart import cart
-from routes.inventory import inventory
-from routes.user_addresses import user_addresses
-from routes.cupons import cupons
-from routes.reviews import reviews
-from routes.reply import reply
-from routes.orders import orders
-from routes.order_items import order_items
-from routes.slider_type import slider_type
-from routes.payment_method import payment_method
-from routes.payments import payments
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import RedirectResponse
+from config import settings, APP_ROLES
+from utils.save_files import UPLOAD_DIR, UploadStatsMiddleware
+from utils.images import shutdown_pool
+from utils.file_refs import track_file_references
+from utils.storage import get_storage
+from utils.static_files import StaticFileServer
 
 
+# Router modules in mount order, with the deployment roles that serve them.
+# A worker started with APP_ROLE=<role> only imports the routers of that role,
+# APP_ROLE=all keeps the monolith behaviour.
+ROUTERS = [
+    ("routes.health.health", ("storefront", "admin", "vendor")),
+    ("routes.auth.registration", ("storefront", "admin", "vendor")),
+    ("routes.auth.login", ("storefront", "admin", "vendor")),
+    ("routes.auth.oauth", ("storefront",)),
+    ("routes.auth.password", ("storefront", "admin", "vendor")),
+    ("routes.users.users", ("storefront", "admin")),
+    ("routes.user_addresses.user_addresses", ("storefront", "admin")),
+    ("routes.categories.categories", ("storefront", "admin", "vendor")),
+    ("routes.sub_categories.sub_categories", ("storefront", "admin", "vendor")),
+    ("routes.brands.brands", ("storefront", "admin", "vendor")),
+    ("routes.vendor.vendors", ("admin", "vendor")),
+    ("routes.bank_details.bank_details", ("admin", "vendor")),
+    ("routes.best_seller.best_seller", ("storefront", "admin")),
+    ("routes.product_features.product_features", ("admin", "vendor")),
+    # Before the products router, whose /products/{product_id} would match "search".
+    ("routes.search.search", ("storefront", "admin")),
+    ("routes.products.products", ("storefront", "admin", "vendor")),
+    ("routes.wishlist.wishlist", ("storefront",)),
+    ("routes.cart_items.cart_items", ("storefront",)),
+    ("routes.cart.cart", ("storefront",)),
+    ("routes.cupons.cupons", ("storefront", "admin")),
+    ("routes.inventory.inventory", ("admin", "vendor")),
+    ("routes.reviews.reviews", ("storefront", "admin")),
+    ("routes.reply.reply", ("storefront", "admin", "vendor")),
+    ("routes.slider_type.slider_type", ("admin",)),
+    ("routes.orders.orders", ("storefront", "admin", "vendor")),
+    ("routes.order_items.order_items", ("storefront", "admin", "vendor")),
+    ("routes.payment_method.payment_method", ("storefront", "admin")),
+    ("routes.payments.payments", ("storefront", "admin")),
+    ("routes.batch.batch", ("storefront", "admin", "vendor")),
+    ("routes.feed.feed", ("storefront",)),
+]
+
 
 async def init_models():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
-app = FastAPI()
+def routers_for_role(role: str):
+    if role not in APP_ROLES:
+        raise ValueError(f"Unknown APP_ROLE '{role}', expected one of {', '.join(APP_ROLES)}")
+    return [path for path, roles in ROUTERS if role == "all" or role in roles]
+
 
-@app.on_event("startup")
-async def on_startup():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     await init_models()
+    # Warmup runs behind the readiness flag so the process can already
+    # answer liveness probes while the pool and statement caches fill.
+    tasks = [
+        asyncio.create_task(warmup(engine)),
+        asyncio.create_task(monitor_loop_lag()),
+        asyncio.create_task(monitor_replicas()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    shutdown_pool()
+    await get_storage().close()
+    await dispose_engines()
+
+
+def create_app(role: str = settings.APP_ROLE) -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
+    track_file_references()
+
+    if settings.LOAD_SHEDDING_ENABLED:
+        app.add_middleware(ConcurrencyLimitMiddleware)
+
+    if replica_engines:
+        app.add_middleware(ReadYourWritesMiddleware)
+
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+
+    app.add_middleware(UploadStatsMiddleware)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    @app.get("/")
+    def hi():
+        return {"hello from" : "pooz store", "role": role}
+
+    storage = get_storage()
+    if storage.is_local:
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        app.mount("/resources", StaticFileServer(UPLOAD_DIR), name="resources")
+    else:
+        # Stored paths keep working as URLs: they redirect to the bucket.
+        @app.get("/resources/{key:path}", include_in_schema=False)
+        def resource(key: str):
+            return RedirectResponse(storage.url(f"{UPLOAD_DIR}{key}"))
+
+    for module_path in routers_for_role(role):
+        module = importlib.import_module(module_path)
+        app.include_router(module.router)
+
+    return app
+
 
-app.add_middleware(
-	CORSMiddleware,
-	allow_origins=["*"],
-	allow_credentials=True,
-	allow_methods=["*"],
-	allow_headers=["*"],
-)
-
-@app.get("/")
-def hi():
-	return {"hello from" : "pooz store"}
-
-app.mount("/resources", StaticFiles(directory="resources"), name="resources")
-
-
-app.include_router(registration.router)
-app.include_router(login.router)
-app.include_router(oauth.router)
-app.include_router(password.router)
-app.include_router(users.router)
-app.include_router(user_addresses.router)
-app.include_router(categories.router)
-app.include_router(sub_categories.router)
-app.include_router(brands.router)
-app.include_router(vendors.router)
-app.include_router(bank_details.router)
-app.include_router(best_seller.router)
-app.include_router(product_features.router)
-app.include_router(products.router)
-app.include_router(wishlist.router)
-app.include_router(cart_items.router)
-app.include_router(cart.router)
-app.include_router(cupons.router)
-app.include_router(inventory.router)
-app.include_router(reviews.router)
-app.include_router(reply.router)
-app.include_router(slider_type.router)
-app.include_router(orders.router)
-app.include_router(order_items.router)
-app.include_router(payment_method.router)
-app.include_router(payments.router)
+app = create_app()
@@ -23,6 +23,8 @@ from models.vendor.vendors import Vendors
 from models.wishlist.wishlist import Wishlist
 from models.notifications.notifications import Notifications
 from models.slider.slider import Sliders
+from models.product_imports.product_imports import ProductImports, ProductImportRows
+from models.stored_files.stored_files import StoredFiles
 
 
 __all__ = [
@@ -41,11 +43,14 @@ __all__ = [
     "Payments",
     "ProductFeatures",
     "product_specific_features",
+    "ProductImports",
+    "ProductImportRows",
     "Products",
     "Reply",
     "Reviews",
     "SliderType",
     "Sliders",
+    "StoredFiles",
     "SubCategories",
     "sub_category_features",
     "Users",
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, Text, JSON, func
+from database.db import Base
+
+class ProductImports(Base):
+    __tablename__ = "product_imports"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    filename = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default="pending")
+    total_rows = Column(Integer, nullable=False, default=0)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    failed_rows = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=True)
+    detail = Column(String(511), nullable=True)
+    created_at = Column(String(50), nullable=False, server_default=func.now())
+    updated_at = Column(String(50), nullable=False, server_default=func.now(), onupdate=func.now())
+
+
+# Raw rows of an import, loaded with COPY and validated in SQL. Everything is
+# text so that bad input lands here and gets a per-row error instead of
+# failing the COPY. Unlogged: the rows only live until the import finishes.
+class ProductImportRows(Base):
+    __tablename__ = "product_import_rows"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    job_id = Column(Integer, primary_key=True)
+    row_number = Column(Integer, primary_key=True)
+    name = Column(Text, nullable=True)
+    description = Column(Text, nullable=True)
+    meta_title = Column(Text, nullable=True)
+    meta_description = Column(Text, nullable=True)
+    price = Column(Text, nullable=True)
+    discount_type = Column(Text, nullable=True)
+    discount_amount = Column(Text, nullable=True)
+    is_active = Column(Text, nullable=True)
+    sub_category_id = Column(Text, nullable=True)
+    brand_id = Column(Text, nullable=True)
+    vendor_id = Column(Text, nullable=True)
+    highlighted_image = Column(Text, nullable=True)
+    images = Column(Text, nullable=True)
+    slug_base = Column(Text, nullable=True)
+    slug = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, ARRAY, Enum as sa_enum, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Boolean, Float, ARRAY, Enum as sa_enum, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from database.db import Base
 from enum import Enum
@@ -10,6 +11,18 @@ class DiscountTypeEnum(Enum):
 
 class Products(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_category_id_is_active_id", "category_id", "is_active", "id"),
+        Index(
+            "ix_products_attributes",
+            "attributes",
+            postgresql_using="gin",
+            postgresql_ops={"attributes": "jsonb_path_ops"},
+        ),
+        # Serves the "base-%" prefix lookups of utils/slug.py and the import,
+        # which the unique index cannot under a non-C collation.
+        Index("ix_products_slug_pattern", "slug", postgresql_ops={"slug": "varchar_pattern_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255), nullable=False)
@@ -27,10 +40,15 @@ class Products(Base):
     available_stock = Column(Integer, nullable=False, default=0)
     quantity_sold = Column(Integer, nullable=False, default=0)
     is_active = Column(Boolean, nullable=False, default=True)
+    # Feature name -> values, for the feature[...] filters (utils/feature_filters.py).
+    attributes = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
     created_at = Column(String(50), nullable=False, server_default=func.now())
     updated_at = Column(String(50), nullable=False, server_default=func.now(), onupdate=func.now())
 
     sub_category_id = Column(Integer, ForeignKey("sub_categories.id"), nullable=False)
+    # Copy of sub_categories.category_id so category filters need no join;
+    # kept in sync by the product and sub category writes.
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     brand_id = Column(Integer, ForeignKey("brands.id"), nullable=False)
     vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False)
 
@@ -49,5 +67,5 @@ class Products(Base):
         "ProductFeatures",
         secondary=product_specific_features,
         back_populates="products",
-        lazy="selectin"
+        lazy="raise"
     )
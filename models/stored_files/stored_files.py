@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, func
+from database.db import Base
+
+
+# One row per stored upload, with the number of columns values referring to
+# it (see utils/file_refs.py). Rows at zero are left for the orphan GC.
+class StoredFiles(Base):
+    __tablename__ = "stored_files"
+
+    path = Column(String(255), primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(String(50), nullable=False, server_default=func.now())
+    updated_at = Column(String(50), nullable=False, server_default=func.now(), onupdate=func.now())
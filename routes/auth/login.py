@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.users.users import LoginSchema
 from auth.login import login_user
 from database.db import get_db
+from config import settings
+from utils.rate_limit import RateLimit
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-@router.post("/login")
-async def login(user: LoginSchema, db: AsyncSession = Depends(get_db)):
+login_limit = RateLimit("login", settings.RATE_LIMIT_LOGIN_IP, settings.RATE_LIMIT_LOGIN_ACCOUNT)
+
+@router.post("/login", dependencies=[Depends(login_limit)])
+async def login(user: LoginSchema, response: Response, db: AsyncSession = Depends(get_db)):
+    await login_limit.hit_account(user.email, response)
     return await login_user(db, user)
\ No newline at end of file
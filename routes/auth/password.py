@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy.future import select
 from schemas.auth.auth import ForgotPasswordRequest, ResetPasswordRequest
@@ -7,13 +7,20 @@ from database.db import get_db
 from auth.security import create_password_reset_token, verify_password_reset_token, hash_password
 from config import settings, PASSWORD_RESET_TEMPLATE
 from utils.email import send_email
+from utils.rate_limit import RateLimit
 import logging
 
 router = APIRouter(prefix="/auth", tags=["Password"])
 
+forgot_password_limit = RateLimit(
+    "forgot-password",
+    settings.RATE_LIMIT_FORGOT_PASSWORD_IP,
+    settings.RATE_LIMIT_FORGOT_PASSWORD_ACCOUNT,
+)
 
-@router.post("/forgot-password")
-async def forgot_password(data: ForgotPasswordRequest, db: Session = Depends(get_db)):
+@router.post("/forgot-password", dependencies=[Depends(forgot_password_limit)])
+async def forgot_password(data: ForgotPasswordRequest, response: Response, db: Session = Depends(get_db)):
+    await forgot_password_limit.hit_account(data.email, response)
     try:
         result = await db.execute(select(Users).filter(Users.email == data.email))
         user = result.scalar_one_or_none()
@@ -7,10 +7,14 @@ from schemas.users.users import UserSchema
 from database.db import get_db
 from auth.registration import register_user, send_verification_email
 from auth.security import decode_email_verification_token
+from config import settings
+from utils.rate_limit import RateLimit
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-@router.post("/register")
+register_limit = RateLimit("register", settings.RATE_LIMIT_REGISTER_IP)
+
+@router.post("/register", dependencies=[Depends(register_limit)])
 async def register(
     user: UserSchema,
     db: AsyncSession = Depends(get_db),
@@ -0,0 +1,84 @@
+import asyncio
+import httpx
+from fastapi import APIRouter, HTTPException, Request
+from schemas.batch.batch import BatchSchema
+from config import settings
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+# Headers passed on to sub-requests so they see the same caller: auth, and
+# the read-your-writes cookie for replica routing.
+FORWARDED_HEADERS = ("authorization", "cookie")
+
+# httpx.ASGITransport buffers each whole response, so endpoints that stream
+# (exports, files under /resources) would be built in memory; they and
+# /batch itself cannot be batched.
+BLOCKED_PREFIXES = ("/batch", "/resources")
+BLOCKED_SUFFIXES = (":export",)
+
+
+# Matched on the decoded path, which is what the transport routes on:
+# "/products%3Aexport" reaches /products:export.
+def batchable(path: str) -> bool:
+    if not path.startswith("/") or path.startswith("//"):
+        return False
+    route = httpx.URL(path).path.rstrip("/")
+    if route.endswith(BLOCKED_SUFFIXES):
+        return False
+    return not any(route == prefix or route.startswith(prefix + "/") for prefix in BLOCKED_PREFIXES)
+
+
+def sub_request_body(response: httpx.Response):
+    if response.headers.get("content-type", "").startswith("application/json"):
+        return response.json()
+    return response.text
+
+
+# Runs several GET requests against this app in one round trip. Each
+# sub-request goes through the normal routing and dependencies, so it gets
+# its own DB session and they can run concurrently (at most
+# BATCH_CONCURRENCY at a time). Every item reports its own status; items
+# still running after BATCH_TIMEOUT_SECONDS come back as 504.
+@router.post("")
+async def run_batch(batch: BatchSchema, request: Request):
+    if not batch.requests:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_REQUESTS} requests per batch")
+    for item in batch.requests:
+        if not batchable(item.path):
+            raise HTTPException(status_code=400, detail=f"Invalid batch path '{item.path}'")
+
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    # Sub-responses are decoded right away, compressing them would be wasted work.
+    headers["accept-encoding"] = "identity"
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    # Sub-requests carry the caller's address, so per-IP rate limits count
+    # them against the caller instead of one shared 127.0.0.1 bucket.
+    client = (request.client.host, request.client.port) if request.client else ("127.0.0.1", 123)
+    transport = httpx.ASGITransport(app=request.app, client=client)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://batch", headers=headers) as client:
+        async def fetch(path: str):
+            async with semaphore:
+                return await client.get(path)
+
+        tasks = [asyncio.create_task(fetch(item.path)) for item in batch.requests]
+        done, pending = await asyncio.wait(tasks, timeout=settings.BATCH_TIMEOUT_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    responses = []
+    for item, task in zip(batch.requests, tasks):
+        entry = {"id": item.id, "path": item.path}
+        if task in pending:
+            entry.update(status=504, body={"detail": "Timed out"})
+        elif task.exception() is not None:
+            entry.update(status=500, body={"detail": str(task.exception())})
+        else:
+            response = task.result()
+            entry.update(status=response.status_code, body=sub_request_body(response))
+        responses.append(entry)
+
+    return {"responses": responses}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from database.db import get_db
+from database.db import get_db, get_read_db
 from schemas.best_seller.best_seller import BestSellerSchema
 from crud.best_seller.best_seller import (
     create_best_seller,
@@ -16,14 +16,14 @@ async def create(vendor_id : int, db: AsyncSession = Depends(get_db)):
     return await create_best_seller(db, vendor_id)
 
 @router.get("/{id}", response_model=BestSellerSchema)
-async def read(id: int, db: AsyncSession = Depends(get_db)):
+async def read(id: int, db: AsyncSession = Depends(get_read_db)):
     return await get_best_seller_by_id(db, id)
 
 @router.get("", response_model=list[BestSellerSchema])
 async def read_all(
     page: int = 0, 
     limit: int = 10, 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
     ):
     return await get_all_best_sellers(db, page, limit)
 
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Form, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from crud.brands.brands import get_brands_by_id, get_all_brands, update_brand, create_brand
-from database.db import get_db
+from database.db import get_db, get_read_db
 from schemas.brands.brands import BrandSchema
 from typing import Optional
 import os
@@ -15,7 +15,7 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 @router.get("")
 async def get_sub_categories(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     is_active: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
@@ -23,7 +23,7 @@ async def get_sub_categories(
     return await get_all_brands(db, page, limit, is_active)
 
 @router.get("/{id}")
-async def get_brands_by_id_data(id: int, db: AsyncSession = Depends(get_db)):
+async def get_brands_by_id_data(id: int, db: AsyncSession = Depends(get_read_db)):
     brand = await get_brands_by_id(db, id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
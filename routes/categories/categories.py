@@ -4,14 +4,16 @@ from crud.categories.categories import (
     get_products_by_category_id,
     get_category_by_id,
     get_all_categories,
+    CATEGORY_LIST_FIELDS,
     get_sub_category_by_category_id,
     update_category,
     create_category
 )
-from database.db import get_db
+from database.db import get_db, get_read_db
 from schemas.categories.categories import CategoriesSchema
 from typing import Optional
 from utils.save_files import save_file, UPLOAD_DIR as upload_dir
+from utils.projection import SparseFields
 import os
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
@@ -19,30 +21,33 @@ router = APIRouter(prefix="/categories", tags=["Categories"])
 UPLOAD_DIR = os.path.join(upload_dir, "categories")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+category_fields = SparseFields(CATEGORY_LIST_FIELDS)
+
 @router.get("")
 async def get_categories(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1),
     is_active: Optional[bool] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    fields: Optional[tuple] = Depends(category_fields),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    return await get_all_categories(db, page, limit, is_active)
+    return await get_all_categories(db, page, limit, is_active, fields)
 
 
 @router.get("/{id}")
-async def get_category_by_id_data(id: int, db: AsyncSession = Depends(get_db)):
+async def get_category_by_id_data(id: int, db: AsyncSession = Depends(get_read_db)):
     return await get_category_by_id(db, id)
 
 
 @router.get("/get_sub_categories/{category_id}")
-async def read_subcategories_by_category(category_id: int, db: AsyncSession = Depends(get_db)):
+async def read_subcategories_by_category(category_id: int, db: AsyncSession = Depends(get_read_db)):
     return await get_sub_category_by_category_id(db, category_id)
 
 
 @router.get("/{category_id}/products")
 async def get_products_by_category(
     category_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1)
 ):
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from crud.feed.feed import get_home_feed
+
+router = APIRouter(prefix="/feed", tags=["Feed"])
+
+
+# Sliders, category tree, best sellers, brands and new arrivals in one call.
+@router.get("/home")
+async def home_feed():
+    return Response(content=await get_home_feed(), media_type="application/json")
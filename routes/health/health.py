@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from utils.health import cached_probe, check_liveness, check_readiness
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz")
+async def healthz():
+    result = await cached_probe("liveness", check_liveness)
+    return JSONResponse(status_code=200 if result["ok"] else 503, content=result)
+
+
+@router.get("/readyz")
+async def readyz():
+    result = await cached_probe("readiness", check_readiness)
+    return JSONResponse(status_code=200 if result["ok"] else 503, content=result)
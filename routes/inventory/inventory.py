@@ -9,7 +9,9 @@ from crud.inventory.inventory import (
     get_inventory_by_id,
     update_inventory,
     delete_inventory,
+    export_inventories,
 )
+from utils.export import ExportFormat
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
@@ -27,6 +29,15 @@ async def read_all(
 ):
     return await get_all_inventories(db, page, limit, product_id, vendor_id)
 
+@router.get(":export")
+async def export_all(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    after_id: Optional[int] = Query(None),
+    product_id: Optional[int] = Query(None),
+    vendor_id: Optional[int] = Query(None),
+):
+    return export_inventories(export_format, after_id, product_id, vendor_id)
+
 @router.get("/{inventory_id}")
 async def read_one(inventory_id: int, db: AsyncSession = Depends(get_db)):
     return await get_inventory_by_id(db, inventory_id)
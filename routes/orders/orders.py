@@ -12,10 +12,16 @@ from crud.orders.orders import (
     update_order_status_fields,
     delete_order_with_items,
     get_orders_with_optional_filters,
+    export_orders,
 )
+from utils.projection import SparseFields
+from utils.serializers.serialize_order import ORDER_FIELDS
+from utils.export import ExportFormat
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+order_fields = SparseFields(ORDER_FIELDS + ("order_items",))
+
 
 @router.post("")
 async def create_order(
@@ -34,6 +40,7 @@ async def get_orders_with_filtering(
     delivery_status: Optional[DeliveryStatus] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(30, ge=1),
+    fields: Optional[tuple] = Depends(order_fields),
     db: AsyncSession = Depends(get_db)
 ):
     return await get_orders_with_optional_filters(
@@ -42,9 +49,20 @@ async def get_orders_with_filtering(
         status=status,
         delivery_status=delivery_status,
         page=page,
-        limit=limit
+        limit=limit,
+        fields=fields,
     )
 
+@router.get(":export")
+async def export_orders_endpoint(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    after_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    status: Optional[OrderStatus] = Query(None),
+    delivery_status: Optional[DeliveryStatus] = Query(None),
+):
+    return export_orders(export_format, after_id, user_id, status, delivery_status)
+
 @router.get("/{order_id}")
 async def read_order(order_id: int, db: AsyncSession = Depends(get_db)):
     return await get_order_with_items(db, order_id)
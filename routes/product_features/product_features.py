@@ -7,7 +7,7 @@ from crud.product_features.product_features import (
     update_product_feature,
     get_feature_with_sub_categories
 )
-from database.db import get_db
+from database.db import get_db, get_read_db
 from schemas.product_features.product_features import ProductFeaturesSchema
 from typing import Optional
 
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/product-features", tags=["Product-Features"])
 
 @router.get("")
 async def read_all_product_features(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     limit: int = Query(100, le=100),
     id: Optional[int] = Query(None),
@@ -42,7 +42,7 @@ async def read_all_product_features(
 @router.get("/{feature_id}")
 async def read_product_feature_by_id(
     feature_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     return await get_product_feature_by_id(db, feature_id)
 
@@ -67,6 +67,6 @@ async def update_feature(
 @router.get("/{feature_id}/sub-categories")
 async def get_feature_details_with_sub_categories(
     feature_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     return await get_feature_with_sub_categories(db, feature_id)
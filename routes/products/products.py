@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from crud.products.products import (
     create_product,
     get_product_by_id,
     get_all_products,
+    get_products_by_ids,
+    export_products,
     get_products_by_vendor_id,
     update_product_by_id,
     update_product_by_vendor_id,
 )
 from schemas.products.products import ProductsSchema
-from database.db import get_db
+from database.db import get_db, get_read_db
 from models.products.products import DiscountTypeEnum
 import os
-from utils.save_files import save_file, UPLOAD_DIR as upload_dir
+from utils.save_files import save_files, UPLOAD_DIR as upload_dir
+from utils.projection import SparseFields
+from utils.batch import batch_ids
+from utils.feature_filters import feature_filters
+from utils.export import ExportFormat
+from crud.product_imports.product_imports import create_import_job, run_import, get_import_job, ImportFormat
+from utils.serializers.serialize_product import PRODUCT_FIELDS
 
 
 router = APIRouter(prefix="/products", tags=["Products"])
@@ -22,10 +30,13 @@ UPLOAD_DIR = os.path.join(upload_dir, "products")
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+product_fields = SparseFields(PRODUCT_FIELDS)
+
 # This function applies filters to the product query based on the provided conditions.
+# Feature filters are passed as feature[<name>]=<value>, e.g. feature[color]=red.
 @router.get("")
 async def list_products(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     limit: int = Query(30, ge=1),
     is_active: Optional[bool] = Query(None),
@@ -39,6 +50,8 @@ async def list_products(
     vendor_id: Optional[int] = Query(None),
     discount_type: Optional[DiscountTypeEnum] = Query(None),
     product_feature_name: Optional[str] = Query(None),
+    features: dict = Depends(feature_filters),
+    fields: Optional[tuple] = Depends(product_fields),
 ):
     return await get_all_products(
         db=db,
@@ -55,11 +68,82 @@ async def list_products(
         vendor_id=vendor_id,
         discount_type=discount_type,
         product_feature_name=product_feature_name,
+        features=features,
+        fields=fields,
+    )
+
+
+# Streams every matching product as NDJSON or CSV; same filters as the list.
+@router.get(":export")
+async def export_products_endpoint(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    after_id: Optional[int] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    name: Optional[str] = Query(None),
+    description: Optional[str] = Query(None),
+    meta_title: Optional[str] = Query(None),
+    meta_description: Optional[str] = Query(None),
+    sub_category_id: Optional[int] = Query(None),
+    category_id: Optional[int] = Query(None),
+    brand_id: Optional[int] = Query(None),
+    vendor_id: Optional[int] = Query(None),
+    discount_type: Optional[DiscountTypeEnum] = Query(None),
+    product_feature_name: Optional[str] = Query(None),
+    features: dict = Depends(feature_filters),
+    fields: Optional[tuple] = Depends(product_fields),
+):
+    return export_products(
+        export_format,
+        after_id,
+        fields,
+        is_active=is_active,
+        name=name,
+        description=description,
+        meta_title=meta_title,
+        meta_description=meta_description,
+        sub_category_id=sub_category_id,
+        category_id=category_id,
+        brand_id=brand_id,
+        vendor_id=vendor_id,
+        discount_type=discount_type,
+        product_feature_name=product_feature_name,
+        features=features,
     )
 
 
+# Bulk import from CSV or JSONL (one object per line). Columns: name, price,
+# discount_type, discount_amount, sub_category_id, brand_id, vendor_id and
+# optionally description, meta_title, meta_description, is_active,
+# highlighted_image and images ("|" separated). Returns the job to poll.
+@router.post(":import", status_code=202)
+async def import_products(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    import_format: Optional[ImportFormat] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_db),
+):
+    job = await create_import_job(db, file, import_format)
+    background_tasks.add_task(run_import, job.id)
+    return await get_import_job(db, job.id)
+
+
+@router.get(":import/{job_id}")
+async def get_import_status(job_id: int, db: AsyncSession = Depends(get_db)):
+    return await get_import_job(db, job_id)
+
+
+# Resolves several products in one query, e.g. /products:batch?ids=3,1,2
+@router.get(":batch")
+async def get_products_batch(
+    ids: tuple = Depends(batch_ids),
+    fields: Optional[tuple] = Depends(product_fields),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await get_products_by_ids(db, ids, fields)
+
+
 @router.get("/{product_id}")
-async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_read_db)):
     return await get_product_by_id(db, product_id)
 
 #This endpoint allows the creation of a new product with various attributes.
@@ -81,8 +165,7 @@ async def create_product_endpoint(
     images: Optional[List[UploadFile]] = File(None),
     db: AsyncSession = Depends(get_db),
 ):
-    highlighted_image_path = await save_file(highlighted_image) if highlighted_image else None
-    image_paths = [await save_file(img) for img in images] if images else []
+    highlighted_image_path, *image_paths = await save_files([highlighted_image, *(images or [])])
 
     parsed_features = []
     if product_specific_features:
@@ -127,8 +210,7 @@ async def update_product_endpoint(
     images: Optional[List[UploadFile]] = File(None),
     db: AsyncSession = Depends(get_db),
 ):
-    highlighted_image_path = await save_file(highlighted_image) if highlighted_image else None
-    image_paths = [await save_file(img) for img in images] if images else []
+    highlighted_image_path, *image_paths = await save_files([highlighted_image, *(images or [])])
 
     parsed_features = []
     if product_specific_features:
@@ -161,9 +243,10 @@ async def list_products_by_vendor_id(
     page: int = Query(1, ge=1),
     limit: int = Query(30, ge=1),
     is_active: Optional[bool] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    fields: Optional[tuple] = Depends(product_fields),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return await get_products_by_vendor_id(db, vendor_id, page, limit, is_active)
+    return await get_products_by_vendor_id(db, vendor_id, page, limit, is_active, fields)
 
 
 
@@ -186,8 +269,7 @@ async def update_specific_product_by_vendor_id(
     images: Optional[List[UploadFile]] = File(None),
     db: AsyncSession = Depends(get_db),
 ):
-    highlighted_image_path = await save_file(highlighted_image) if highlighted_image else None
-    image_paths = [await save_file(img) for img in images] if images else []
+    highlighted_image_path, *image_paths = await save_files([highlighted_image, *(images or [])])
 
     parsed_features = []
     if product_specific_features:
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from database.db import get_db
+from database.db import get_db, get_read_db
 from schemas.reply.reply import ReplySchema
 from crud.reply import reply as crud_reply
 
@@ -17,18 +17,18 @@ async def create_reply(reply: ReplySchema, db: AsyncSession = Depends(get_db)):
     return db_reply
 
 @router.get("")
-async def get_all_replies(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def get_all_replies(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_read_db)):
     return await crud_reply.get_all_replies(db, skip=skip, limit=limit)
 
 @router.get("/{reply_id}")
-async def get_reply_by_id(reply_id: int, db: AsyncSession = Depends(get_db)):
+async def get_reply_by_id(reply_id: int, db: AsyncSession = Depends(get_read_db)):
     db_reply = await crud_reply.get_reply_by_reply_id(db, reply_id)
     if not db_reply:
         raise HTTPException(status_code=404, detail="Reply not found")
     return db_reply
 
 @router.get("/review/{review_id}")
-async def get_replies_by_review_id(review_id: int, db: AsyncSession = Depends(get_db)):
+async def get_replies_by_review_id(review_id: int, db: AsyncSession = Depends(get_read_db)):
     return await crud_reply.get_replies_by_review_id(db, review_id)
 
 @router.put("/{reply_id}")
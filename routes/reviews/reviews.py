@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from database.db import get_db
+from database.db import get_db, get_read_db
 from crud.reviews import reviews as review_crud
 from schemas.reviews.reviews import ReviewsSchema
 import os
@@ -44,7 +44,7 @@ async def create_review(
 
 
 @router.get("/{review_id}")
-async def get_review(review_id: int, db: AsyncSession = Depends(get_db)):
+async def get_review(review_id: int, db: AsyncSession = Depends(get_read_db)):
     review = await review_crud.get_review_by_id(db, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
@@ -55,7 +55,7 @@ async def get_reviews_by_product_id(
     product_id: int,
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     reviews = await review_crud.get_reviews_by_product_id(db, product_id, skip=skip, limit=limit)
     if not reviews:
@@ -64,7 +64,7 @@ async def get_reviews_by_product_id(
 
 
 @router.get("")
-async def list_reviews(skip: int = Query(0), limit: int = Query(10), db: AsyncSession = Depends(get_db)):
+async def list_reviews(skip: int = Query(0), limit: int = Query(10), db: AsyncSession = Depends(get_read_db)):
     return await review_crud.get_all_reviews(db, skip, limit)
 
 
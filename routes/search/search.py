@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from database.db import get_db
+from database.db import get_read_db
 from crud.search.search import search_products as search_products_crud
+from config import settings
+from utils.rate_limit import RateLimit
 
 router = APIRouter()
 
-@router.get("/products/search")
+search_limit = RateLimit("search", settings.RATE_LIMIT_SEARCH_IP)
+
+@router.get("/products/search", dependencies=[Depends(search_limit)])
 async def search_products(
     q: str = Query(..., min_length=3),
     brand_id: Optional[int] = None,
@@ -17,7 +21,7 @@ async def search_products(
     order: Optional[str] = "asc",
     page: int = 1,
     limit: int = 20,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     total, products = await search_products_crud(
         db=db,
@@ -43,10 +47,10 @@ async def search_products(
                 "price": float(p.price),
                 "payable_price": float(p.payable_price),
                 "available_stock": p.available_stock,
-                "brand": p.brand.name if p.brand else None,
-                "subcategory": p.subcategory.name if p.subcategory else None,
+                "brand": p.brands.name if p.brands else None,
+                "subcategory": p.sub_categories.name if p.sub_categories else None,
                 "slug": p.slug,
-                "highligthed_image": p.highligthed_image or [],
+                "highlighted_image": p.highlighted_image,
             } for p in products
         ]
     }
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Form, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from crud.slider.slider import get_all_sliders, create_slider, update_slider, get_slider_by_id, get_sliders_by_slider_type_id
-from database.db import get_db
+from database.db import get_db, get_read_db
 from schemas.slider.slider import SlidersSchema, UpdateSlidersSchema
 from typing import Optional
 import os
@@ -34,12 +34,12 @@ async def get_all_sliders_data(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1),
     is_active: Optional[bool] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     return await get_all_sliders(db, page, limit, is_active)
 
 @router.get("/{slider_id}")
-async def read_slider_by_id(slider_id: int, db: AsyncSession = Depends(get_db)):
+async def read_slider_by_id(slider_id: int, db: AsyncSession = Depends(get_read_db)):
     return await get_slider_by_id(db, slider_id)
 
 @router.get("/by-type/{slider_type_id}")
@@ -47,7 +47,7 @@ async def read_sliders_by_type(
     slider_type_id: int,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     return await get_sliders_by_slider_type_id(db, slider_type_id, page, limit)
 
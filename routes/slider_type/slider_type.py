@@ -7,9 +7,10 @@ from crud.slider_type.slider_type import (
     get_slider_type_by_id,
     get_slider_types,
 )
-from database.db import get_db
+from database.db import get_db, get_read_db
 from schemas.slider_type.slider_type import SliderTypeSchema
 from typing import Optional
+from utils.feed_cache import invalidate_feed
 
 router = APIRouter(prefix="/slider_type", tags=["Slider Type"])
 
@@ -36,7 +37,7 @@ async def create_slider_type_data(
 
 @router.get("")
 async def get_slider_types_data(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     is_active: bool | None = Query(default=None),
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=10, ge=1, le=100),
@@ -46,7 +47,7 @@ async def get_slider_types_data(
 @router.get("/{slider_type_id}")
 async def get_slider_type_data(
     slider_type_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     slider_type = await get_slider_type_by_id(db, slider_type_id)
     if not slider_type:
@@ -83,6 +84,6 @@ async def update_slider_type_data(
 
     db.add(slider_type)
     await db.commit()
-    await db.refresh(slider_type)
+    invalidate_feed("sliders")
 
     return slider_type
\ No newline at end of file
@@ -7,7 +7,7 @@ from crud.sub_categories.sub_categories import (
     create_sub_category,
     get_products_by_sub_category_id
 )
-from database.db import get_db
+from database.db import get_db, get_read_db
 from schemas.sub_categories.sub_categories import SubCategoriesSchema
 from typing import Optional
 from utils.save_files import save_file, UPLOAD_DIR as upload_dir
@@ -23,12 +23,12 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 async def get_sub_categories(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     return await get_all_sub_categories(db, page, limit)
 
 @router.get("/{id}")
-async def get_sub_category_by_id_data(id: int, db: AsyncSession = Depends(get_db)):
+async def get_sub_category_by_id_data(id: int, db: AsyncSession = Depends(get_read_db)):
     return await get_sub_category_by_id(db, id)
 
 @router.patch("/{id}")
@@ -116,7 +116,7 @@ async def create_sub_category_data(
 @router.get("/{sub_category_id}/products")
 async def get_products_by_sub_category(
     sub_category_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1),
 ):
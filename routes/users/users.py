@@ -2,10 +2,12 @@ from typing import Optional
 from fastapi import APIRouter, Form, UploadFile, File, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from models.users.users import genders
-from crud.users.users import get_user, get_users, update_user
+from crud.users.users import get_user, get_users, get_users_by_ids, export_users, update_user
 from database.db import get_db
 from schemas.users.users import UpdateUserSchema
 from utils.save_files import save_file, UPLOAD_DIR as upload_dir
+from utils.batch import batch_ids
+from utils.export import ExportFormat
 from datetime import datetime
 import os
 
@@ -43,6 +45,24 @@ async def get_all_users(
     )
 
 
+@router.get(":export")
+async def export_all_users(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    after_id: Optional[int] = Query(None),
+    search: Optional[str] = None,
+    user_id: Optional[int] = None,
+    status: Optional[bool] = None,
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+):
+    return export_users(export_format, after_id, search, user_id, status, created_from, created_to)
+
+
+@router.get(":batch")
+async def get_users_batch(ids: tuple = Depends(batch_ids), db: AsyncSession = Depends(get_db)):
+    return await get_users_by_ids(db, ids)
+
+
 @router.get("/{user_id}")
 async def get_user_by_id(user_id: int, db: AsyncSession = Depends(get_db)):
     user = await get_user(db, user_id)
@@ -71,7 +91,7 @@ async def patch_user_info(
     file_path = None
     if image:
         try:
-            file_path = save_file(image, folder=UPLOAD_DIR)
+            file_path = await save_file(image, folder=UPLOAD_DIR)
         finally:
             await image.close()
 
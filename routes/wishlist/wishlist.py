@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from crud.wishlist.wishlist import get_wishlists_by_user_id, create_wishlist, delete_wishlist_item
+from crud.wishlist.wishlist import get_wishlists_by_user_id, create_wishlist, delete_wishlist_item, WISHLIST_FIELDS
 from database.db import get_db
 from schemas.wishlist.wishlist import WishlistSchema, WishlistItemResponse
+from utils.projection import SparseFields
+from typing import Optional
 
 router = APIRouter(prefix="/wishlist", tags=["Wishlist"])
 
+wishlist_fields = SparseFields(WISHLIST_FIELDS)
+
 # create wishlist 
 @router.post("/", response_model=WishlistItemResponse)
 async def add_to_wishlist(
@@ -21,8 +25,9 @@ async def get_wishlist_by_user_id_data(
     db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1),
     limit: int = Query(30, ge=1),
+    fields: Optional[tuple] = Depends(wishlist_fields),
 ):
-    return await get_wishlists_by_user_id(db, user_id, page, limit)
+    return await get_wishlists_by_user_id(db, user_id, page, limit, fields)
 
 # Delete the wishlist by wishlist ID
 @router.delete("/{wishlist_id}")
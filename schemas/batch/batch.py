@@ -0,0 +1,9 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class BatchItemSchema(BaseModel):
+    id: Optional[str] = None
+    path: str
+
+class BatchSchema(BaseModel):
+    requests: List[BatchItemSchema]
@@ -0,0 +1,78 @@
+import argparse
+import importlib.util
+import os
+import uvicorn
+from config import settings
+
+# Production entrypoint: python -m server
+# `uvicorn main:app --reload` stays the development command.
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    return available_cpus()
+
+
+def has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def server_options(workers: int) -> dict:
+    return {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": workers,
+        "loop": "uvloop" if has_module("uvloop") else "asyncio",
+        "http": "httptools" if has_module("httptools") else "h11",
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE,
+        "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY or None,
+        "limit_max_requests": settings.SERVER_MAX_REQUESTS or None,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.SERVER_TRUSTED_PROXIES,
+        "access_log": settings.DEBUG,
+    }
+
+
+def run(workers: int):
+    options = server_options(workers)
+
+    if workers == 1:
+        # Single process: import the app up front so import errors surface
+        # before the socket is bound. With several workers uvicorn spawns
+        # fresh interpreters, and the asyncpg pool must never cross a fork,
+        # so each worker imports main:app itself.
+        from main import app
+        target = app
+    else:
+        target = "main:app"
+
+    print(
+        f"Starting {workers} worker(s) on {options['host']}:{options['port']} "
+        f"(loop={options['loop']}, http={options['http']}, role={settings.APP_ROLE})"
+    )
+    uvicorn.run(target, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with production server settings")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to WEB_CONCURRENCY or the CPU count")
+    parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.port:
+        settings.SERVER_PORT = args.port
+    run(args.workers or default_workers())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from routes.batch.batch import batchable, router
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.get("/products")
+    def products():
+        return {"data": []}
+
+    @app.get("/products:export")
+    def export():
+        return {"exported": True}
+
+    @app.get("/resources/{key:path}")
+    def resource(key: str):
+        return {"key": key}
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", [
+    "/products:export",
+    "/products%3Aexport",
+    "/products%3aexport?format=csv",
+    "/resources/a.png",
+    "/resources%2Fa.png",
+    "/batch",
+    "/batch%2F",
+    "//evil.example/products",
+    "products",
+])
+def test_blocked_paths(path):
+    assert not batchable(path)
+
+
+@pytest.mark.parametrize("path", ["/products", "/products?page=2", "/products:batch?ids=1,2", "/batchy"])
+def test_allowed_paths(path):
+    assert batchable(path)
+
+
+@pytest.mark.parametrize("path", ["/products%3Aexport", "/resources%2Fa.png"])
+def test_encoded_streaming_paths_are_rejected(client, path):
+    response = client.post("/batch", json={"requests": [{"id": "1", "path": path}]})
+    assert response.status_code == 400
+
+
+def test_batch_runs_allowed_paths(client):
+    response = client.post("/batch", json={"requests": [{"id": "1", "path": "/products"}]})
+    assert response.status_code == 200
+    assert response.json()["responses"] == [{"id": "1", "path": "/products", "status": 200, "body": {"data": []}}]
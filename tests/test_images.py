@@ -0,0 +1,50 @@
+import os
+import pytest
+from config import settings
+from utils import images
+from utils.images import DERIVATIVE_SIZES, derivative_path, derivative_urls
+
+
+@pytest.fixture
+def original(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_DERIVATIVES_ENABLED", True)
+    monkeypatch.setattr(images, "Image", object())
+    monkeypatch.setattr(images, "_published", {})
+    path = os.path.join(tmp_path, "abc.jpg")
+    open(path, "wb").close()
+    return path
+
+
+def write_derivatives(path: str):
+    for size in DERIVATIVE_SIZES:
+        for webp in (True, False):
+            open(derivative_path(path, size, webp), "wb").close()
+
+
+def test_falls_back_to_original_until_published(original):
+    assert derivative_urls(original) == {
+        size: {"webp": original, "original": original} for size in DERIVATIVE_SIZES
+    }
+
+    write_derivatives(original)
+    urls = derivative_urls(original)
+    assert urls["card"] == {
+        "webp": derivative_path(original, "card", True),
+        "original": derivative_path(original, "card", False),
+    }
+
+
+def test_partial_set_is_not_published(original):
+    open(derivative_path(original, "zoom", True), "wb").close()
+    assert derivative_urls(original)["zoom"]["webp"] == original
+
+
+def test_falls_back_when_disabled(original, monkeypatch):
+    write_derivatives(original)
+    monkeypatch.setattr(settings, "IMAGE_DERIVATIVES_ENABLED", False)
+    assert derivative_urls(original)["thumbnail"]["original"] == original
+
+
+def test_non_images_have_no_variants():
+    assert derivative_urls(None) is None
+    assert derivative_urls("resources/doc.pdf") is None
@@ -0,0 +1,89 @@
+import asyncio
+from sqlalchemy import Column, Integer, String, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+import utils.slug
+from utils.slug import flush_with_unique_slug
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    slug = Column(String(255), nullable=False, unique=True)
+    description = Column(String(255), nullable=True)
+
+
+async def with_engine(run):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        return await run(engine)
+    finally:
+        await engine.dispose()
+
+
+# The first lookup misses "foo", as if another request took it between the
+# lookup and the flush.
+def race_first_lookup(monkeypatch):
+    real = utils.slug.generate_unique_slug
+    calls = []
+
+    async def racing_slug(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            return "foo"
+        return await real(*args, **kwargs)
+
+    monkeypatch.setattr(utils.slug, "generate_unique_slug", racing_slug)
+    return calls
+
+
+async def update_with_collision(engine, monkeypatch):
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        db.add_all([Item(name="Foo", slug="foo"), Item(name="Bar", slug="bar", description="old")])
+        await db.commit()
+
+        item = (await db.execute(select(Item).where(Item.slug == "bar"))).scalar_one()
+        item.name = "Foo"
+        item.description = "new"
+
+        calls = race_first_lookup(monkeypatch)
+        await flush_with_unique_slug(db, item, "Foo")
+        await db.commit()
+        result = (item.name, item.slug, item.description, len(calls))
+
+    async with AsyncSession(engine) as db:
+        stored = (await db.execute(select(Item).where(Item.id == 2))).scalar_one()
+        stored = (stored.name, stored.slug, stored.description)
+
+    return result, stored
+
+
+async def create_with_collision(engine, monkeypatch):
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        db.add(Item(name="Foo", slug="foo"))
+        await db.commit()
+
+        calls = race_first_lookup(monkeypatch)
+        item = Item(name="Foo", description="second")
+        await flush_with_unique_slug(db, item, "Foo")
+        await db.commit()
+        return item.slug, item.description, len(calls)
+
+
+def test_slug_collision_during_update_keeps_pending_changes(monkeypatch):
+    result, stored = asyncio.run(with_engine(lambda engine: update_with_collision(engine, monkeypatch)))
+    assert result == ("Foo", "foo-1", "new", 2)
+    assert stored == ("Foo", "foo-1", "new")
+
+
+def test_slug_collision_during_create_retries(monkeypatch):
+    result = asyncio.run(with_engine(lambda engine: create_with_collision(engine, monkeypatch)))
+    assert result == ("foo-1", "second", 2)
@@ -0,0 +1,59 @@
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from utils.static_files import StaticFileServer
+
+BODY = b"body { color: red; }\n" * 200
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "site.css").write_bytes(BODY)
+    (tmp_path / "site.css.gz").write_bytes(gzip.compress(BODY))
+    app = FastAPI()
+    app.mount("/resources", StaticFileServer(str(tmp_path)))
+    return TestClient(app)
+
+
+def test_variant_has_its_own_etag(client):
+    identity = client.get("/resources/site.css", headers={"accept-encoding": "identity"})
+    compressed = client.get("/resources/site.css", headers={"accept-encoding": "gzip"})
+
+    assert "content-encoding" not in identity.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.content == BODY
+    assert identity.headers["etag"] != compressed.headers["etag"]
+    assert compressed.headers["etag"] == identity.headers["etag"][:-1] + '-gz"'
+
+
+def test_if_none_match_is_per_encoding(client):
+    etag = client.get("/resources/site.css", headers={"accept-encoding": "identity"}).headers["etag"]
+
+    same = client.get("/resources/site.css", headers={"accept-encoding": "identity", "if-none-match": etag})
+    other = client.get("/resources/site.css", headers={"accept-encoding": "gzip", "if-none-match": etag})
+
+    assert same.status_code == 304
+    assert other.status_code == 200
+    assert other.headers["content-encoding"] == "gzip"
+
+
+def test_if_range_with_variant_etag_sends_whole_identity(client):
+    etag = client.get("/resources/site.css", headers={"accept-encoding": "gzip"}).headers["etag"]
+
+    response = client.get(
+        "/resources/site.css",
+        headers={"accept-encoding": "gzip", "range": "bytes=0-9", "if-range": etag},
+    )
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY
+
+
+def test_range_is_served_from_identity(client):
+    response = client.get("/resources/site.css", headers={"accept-encoding": "gzip", "range": "bytes=0-9"})
+
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY[:10]
@@ -0,0 +1,30 @@
+from fastapi import HTTPException, Query
+from config import settings
+
+# Shared plumbing for the `:batch` lookups, e.g. `GET /products:batch?ids=3,1,2`.
+# Ids are resolved with one IN query and returned in the requested order;
+# ids that do not exist are listed under "missing" instead of failing the
+# whole batch.
+
+
+def batch_ids(ids: str = Query(..., description=f"Comma-separated ids, at most {settings.BATCH_MAX_IDS}")) -> tuple:
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+
+    unique = tuple(dict.fromkeys(parsed))
+    if not unique:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(unique) > settings.BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_IDS} ids per batch")
+    return unique
+
+
+async def fetch_batch(db, query, id_column, ids: tuple, serialize) -> dict:
+    result = await db.execute(query.where(id_column.in_(ids)))
+    found = {getattr(row, id_column.key): row for row in result.unique().scalars()}
+    return {
+        "data": [serialize(found[id]) for id in ids if id in found],
+        "missing": [id for id in ids if id not in found],
+    }
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+
+# Throughput comparison between the dev command and the production runner.
+#
+#   python -m utils.bench_server
+#   python -m utils.bench_server --path /products --concurrency 128 --duration 20
+
+COMMANDS = {
+    "dev (uvicorn --reload)": [
+        sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", "{port}", "--reload",
+    ],
+    "prod (python -m server)": [
+        sys.executable, "-m", "server", "--port", "{port}",
+    ],
+}
+
+
+async def wait_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get("/")
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready in {timeout}s")
+
+
+async def load(base_url: str, path: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    stop_at = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 1),
+        "p50_ms": round(latencies[count // 2] * 1000, 2) if count else None,
+        "p99_ms": round(latencies[int(count * 0.99) - 1] * 1000, 2) if count else None,
+    }
+
+
+def bench(name: str, command: list, port: int, path: str, concurrency: int, duration: float) -> dict:
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, SERVER_HOST="127.0.0.1")
+    proc = subprocess.Popen(
+        [part.format(port=port) for part in command],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_ready(base_url))
+        asyncio.run(load(base_url, path, concurrency, 2))  # warm up
+        result = asyncio.run(load(base_url, path, concurrency, duration))
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    result["name"] = name
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dev and production server throughput")
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args()
+
+    print(f"GET {args.path}, concurrency {args.concurrency}, {args.duration}s per run")
+    for name, command in COMMANDS.items():
+        result = bench(name, command, args.port, args.path, args.concurrency, args.duration)
+        print(
+            f"{result['name']:<26} {result['rps']:>9} req/s  p50 {result['p50_ms']} ms  "
+            f"p99 {result['p99_ms']} ms  errors {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
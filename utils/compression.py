@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+from collections import OrderedDict
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response compression. Bodies above COMPRESSION_MIN_SIZE with an allowlisted
+# content type are brotli or gzip encoded, depending on Accept-Encoding;
+# bodies above COMPRESSION_THREAD_SIZE are compressed in a worker thread so a
+# large category tree or order history does not stall the event loop.
+#
+# Successful GETs get an ETag derived from the body (unless the route set
+# one) and their compressed bytes are cached under it, so a hot catalog page
+# is compressed once and then only hashed. Streaming responses (more than one
+# body message) are passed through untouched.
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "text/xml",
+}
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+# Codings the client accepts; "gzip;q=0", "br; q=0.0" and the like are
+# refusals. A malformed q value counts as a refusal too.
+def accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        coding = coding.strip().lower()
+        if coding and quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def choose_encoding(accept_encoding: str):
+    offered = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return None
+
+
+# Compressed bodies keyed by (etag, encoding), evicted least recently used
+# once the total size exceeds max_bytes.
+class CompressedCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is not None:
+            self.entries.move_to_end(key)
+        return body
+
+    def put(self, key, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = None, thread_size: int = None, cache_mb: int = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.thread_size = settings.COMPRESSION_THREAD_SIZE if thread_size is None else thread_size
+        cache_mb = settings.COMPRESSION_CACHE_MB if cache_mb is None else cache_mb
+        self.cache = CompressedCache(cache_mb * 1024 * 1024)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough:
+                await send(message)
+                return
+            # Streaming bodies and file sends (http.response.pathsend) go out as they are.
+            if message["type"] != "http.response.body" or message.get("more_body", False):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            await self.send_compressed(scope, start, message.get("body", b""), encoding, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def should_compress(self, status: int, headers: MutableHeaders, body: bytes) -> bool:
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        # A 206 body is a slice of the file and its Content-Range counts
+        # uncompressed bytes, so partial responses are never encoded.
+        return (
+            200 <= status < 300
+            and status not in (204, 206)
+            and "content-range" not in headers
+            and "content-encoding" not in headers
+            and content_type in COMPRESSIBLE_TYPES
+            and len(body) >= self.minimum_size
+        )
+
+    async def send_compressed(self, scope, start, body: bytes, encoding: str, send):
+        headers = MutableHeaders(raw=start["headers"])
+        if not self.should_compress(start["status"], headers, body):
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        cacheable = (
+            scope["method"] == "GET"
+            and start["status"] == 200
+            and "no-store" not in headers.get("cache-control", "")
+        )
+        compressed = None
+        if cacheable:
+            etag = headers.get("etag")
+            if etag is None:
+                etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            # The encoded representation is not byte-identical to the one the
+            # ETag was computed for, so it is only a weak validator from here.
+            if not etag.startswith("W/"):
+                etag = f"W/{etag}"
+            headers["ETag"] = etag
+            key = (etag, encoding)
+            compressed = self.cache.get(key)
+
+        if compressed is None:
+            if len(body) >= self.thread_size:
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            if cacheable:
+                self.cache.put(key, compressed)
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        await send(start)
+        await send({"type": "http.response.body", "body": compressed})
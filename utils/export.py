@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from enum import Enum
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from database.db import read_session
+from config import settings
+
+# Streaming exports (`GET /products:export`, `/orders:export`, ...). Rows are
+# read through a server-side cursor EXPORT_BATCH_SIZE at a time and written
+# to the response as they arrive, so memory stays flat however large the
+# export is. Rows go out in id order; a client that lost the connection asks
+# again with after_id=<last id it received> and gets the rest.
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {ExportFormat.ndjson: "application/x-ndjson", ExportFormat.csv: "text/csv"}
+
+
+def encode_ndjson(rows: list) -> bytes:
+    return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows).encode()
+
+
+# Nested values (order items, product features, image lists) are written to
+# their CSV cell as JSON.
+def csv_value(value):
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def encode_csv(rows: list, columns: list, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow(csv_value(row.get(name)) for name in columns)
+    return buffer.getvalue().encode()
+
+
+async def stream_export(query, serialize, export_format: ExportFormat):
+    columns = None
+    async with read_session() as db:
+        result = await db.stream(query)
+        async for partition in result.scalars().partitions():
+            rows = jsonable_encoder([serialize(obj) for obj in partition])
+            if export_format == ExportFormat.ndjson:
+                yield encode_ndjson(rows)
+            else:
+                header = columns is None
+                if header:
+                    columns = list(rows[0])
+                yield encode_csv(rows, columns, header)
+
+
+def export_response(query, id_column, serialize, export_format: ExportFormat, name: str, after_id: int = None):
+    if after_id is not None:
+        query = query.where(id_column > after_id)
+    query = query.order_by(id_column).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+    return StreamingResponse(
+        stream_export(query, serialize, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'},
+    )
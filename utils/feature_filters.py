@@ -0,0 +1,76 @@
+import re
+from fastapi import HTTPException, Request
+from sqlalchemy import or_, text
+
+# Structured feature filters: `?feature[color]=red&feature[ram]=16GB`.
+# Products.attributes holds the product's active features as
+# {"<name>": ["<value>", "<value><unit>"]}, lower-cased, and has a GIN index,
+# so the filters are answered with jsonb containment (@>) from the index.
+# All names must match; repeating a name (`feature[color]=red&feature[color]=blue`)
+# matches any of its values.
+
+# Products.attributes rebuilt from the product's linked features. Written
+# in SQL so products touched by a feature edit are refreshed in one UPDATE.
+PRODUCT_ATTRIBUTES = """
+    coalesce((
+        SELECT jsonb_object_agg(a.name, a.vals)
+        FROM (
+            SELECT lower(trim(f.name)) AS name, jsonb_agg(DISTINCT v.value ORDER BY v.value) AS vals
+            FROM product_specific_features psf
+            JOIN product_features f ON f.id = psf.feature_id
+            CROSS JOIN LATERAL (
+                VALUES (lower(trim(f.value))), (lower(trim(f.value) || coalesce(trim(f.unit), '')))
+            ) AS v(value)
+            WHERE psf.product_id = products.id
+              AND f.is_active IS NOT FALSE
+              AND coalesce(trim(f.value), '') <> ''
+            GROUP BY 1
+        ) a
+    ), '{}'::jsonb)
+"""
+REFRESH_PRODUCTS = text(f"UPDATE products SET attributes = {PRODUCT_ATTRIBUTES} WHERE id = ANY(:product_ids)")
+REFRESH_FEATURE_PRODUCTS = text(
+    f"UPDATE products SET attributes = {PRODUCT_ATTRIBUTES} "
+    "WHERE id IN (SELECT product_id FROM product_specific_features WHERE feature_id = :feature_id)"
+)
+
+FEATURE_PARAM = re.compile(r"^feature\[([^\]]+)\]$")
+MAX_FEATURE_FILTERS = 10
+
+
+def normalize(text: str) -> str:
+    return text.strip().lower()
+
+
+def feature_filters(request: Request) -> dict:
+    features = {}
+    for key, value in request.query_params.multi_items():
+        match = FEATURE_PARAM.match(key)
+        if match and value.strip():
+            values = features.setdefault(normalize(match.group(1)), [])
+            if normalize(value) not in values:
+                values.append(normalize(value))
+    if sum(len(values) for values in features.values()) > MAX_FEATURE_FILTERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_FEATURE_FILTERS} feature filters")
+    return features
+
+
+# Names with a single value are folded into one containment test; each name
+# with several values adds an OR of containments (a BitmapOr on the index).
+def features_condition(column, features: dict) -> list:
+    required = {name: [values[0]] for name, values in features.items() if len(values) == 1}
+    conditions = [column.contains(required)] if required else []
+    for name, values in features.items():
+        if len(values) > 1:
+            conditions.append(or_(*(column.contains({name: [value]}) for value in values)))
+    return conditions
+
+
+async def refresh_product_attributes(db, product_ids: list):
+    await db.flush()
+    await db.execute(REFRESH_PRODUCTS, {"product_ids": list(product_ids)})
+
+
+async def refresh_feature_products(db, feature_id: int):
+    await db.flush()
+    await db.execute(REFRESH_FEATURE_PRODUCTS, {"feature_id": feature_id})
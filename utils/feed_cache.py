@@ -0,0 +1,43 @@
+import asyncio
+import json
+import logging
+import time
+from fastapi.encoders import jsonable_encoder
+
+# Section cache for /feed/home. Sections are stored already JSON encoded, so
+# a warm feed is assembled by joining bytes. Writers call invalidate_feed()
+# after commit; on other workers the section TTL bounds how stale it gets.
+# An invalidated or expired section keeps its last value, which is served if
+# reloading it fails.
+
+_sections = {}
+_locks = {}
+
+
+def invalidate_feed(*names: str):
+    for name in names:
+        if name in _sections:
+            _sections[name] = (0.0, _sections[name][1])
+
+
+def encode(data) -> bytes:
+    return json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+
+
+async def cached_section(name: str, ttl: float, load) -> bytes:
+    cached = _sections.get(name)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    lock = _locks.setdefault(name, asyncio.Lock())
+    async with lock:
+        cached = _sections.get(name)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        try:
+            body = encode(await load())
+        except Exception as e:
+            logging.warning(f"Feed section '{name}' failed to load: {e}")
+            return cached[1] if cached else b"null"
+        _sections[name] = (time.monotonic() + ttl, body)
+        return body
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+from collections import Counter
+from sqlalchemy import ARRAY, bindparam, event, func, inspect, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from database.db import engine
+from models.brands.brands import Brands
+from models.categories.categories import Categories
+from models.products.products import Products
+from models.slider.slider import Sliders
+from models.stored_files.stored_files import StoredFiles
+from models.sub_categories.sub_categories import SubCategories
+from models.users.users import Users
+from models.vendor.vendors import Vendors
+from utils.save_files import UPLOAD_DIR
+
+# Reference counts for stored uploads. Uploads are content addressed, so
+# one file can back any number of rows; stored_files.ref_count says how many
+# column values point at it. Counts are adjusted on every ORM flush from the
+# attribute history of the columns below. Writes that bypass the ORM (the
+# product import) adjust them in SQL, and `python -m utils.file_refs recount`
+# rebuilds them from scratch.
+FILE_REFERENCES = {
+    Products: ("highlighted_image", "images"),
+    Vendors: ("logo", "documents"),
+    Brands: ("image",),
+    Categories: ("image",),
+    SubCategories: ("image",),
+    Users: ("image",),
+    Sliders: ("image",),
+}
+
+
+def stored_paths(value):
+    values = value if isinstance(value, (list, tuple)) else (value,)
+    return [v for v in values if isinstance(v, str) and v.startswith(UPLOAD_DIR)]
+
+
+def reference_changes(session: Session) -> Counter:
+    changes = Counter()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        columns = FILE_REFERENCES.get(type(obj))
+        if not columns:
+            continue
+        state = inspect(obj)
+        for name in columns:
+            if obj in session.new:
+                changes.update(stored_paths(state.dict.get(name)))
+            elif obj in session.deleted:
+                changes.subtract(stored_paths(state.dict.get(name)))
+            else:
+                history = state.attrs[name].history
+                for value in history.added:
+                    changes.update(stored_paths(value))
+                for value in history.deleted:
+                    changes.subtract(stored_paths(value))
+    return changes
+
+
+def apply_changes(connection, changes: Counter):
+    # Sorted, so concurrent flushes lock rows in the same order.
+    added = [{"path": path, "ref_count": n} for path, n in sorted(changes.items()) if n > 0]
+    removed = [{"file_path": path, "n": -n} for path, n in sorted(changes.items()) if n < 0]
+
+    if added:
+        stmt = insert(StoredFiles).values(added)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[StoredFiles.path],
+            set_={"ref_count": StoredFiles.ref_count + stmt.excluded.ref_count, "updated_at": func.now()},
+        ))
+    if removed:
+        table = StoredFiles.__table__
+        connection.execute(
+            update(table)
+            .where(table.c.path == bindparam("file_path"))
+            .values(ref_count=func.greatest(table.c.ref_count - bindparam("n"), 0), updated_at=func.now()),
+            removed,
+        )
+
+
+def _after_flush(session: Session, flush_context):
+    changes = reference_changes(session)
+    if any(changes.values()):
+        apply_changes(session.connection(), changes)
+
+
+def track_file_references():
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+
+# Every stored path referenced by a row, one row per reference.
+def referenced_paths_query():
+    selects = []
+    for model, columns in FILE_REFERENCES.items():
+        for name in columns:
+            column = getattr(model, name)
+            value = func.unnest(column) if isinstance(column.type, ARRAY) else column
+            selects.append(select(value.label("path")))
+    refs = union_all(*selects).subquery()
+    return select(refs.c.path).where(refs.c.path.like(f"{UPLOAD_DIR}%"))
+
+
+async def recount(conn):
+    refs = referenced_paths_query().subquery()
+    counted = select(refs.c.path, func.count().label("ref_count")).group_by(refs.c.path)
+    stmt = insert(StoredFiles).from_select(["path", "ref_count"], counted)
+    await conn.execute(stmt.on_conflict_do_update(
+        index_elements=[StoredFiles.path],
+        set_={"ref_count": stmt.excluded.ref_count, "updated_at": func.now()},
+    ))
+    await conn.execute(
+        update(StoredFiles)
+        .where(StoredFiles.ref_count > 0, StoredFiles.path.not_in(select(refs.c.path)))
+        .values(ref_count=0)
+    )
+    return (await conn.execute(
+        select(func.count(), func.coalesce(func.sum(StoredFiles.ref_count), 0))
+        .where(StoredFiles.ref_count > 0)
+    )).one()
+
+
+async def main():
+    async with engine.begin() as conn:
+        files, references = await recount(conn)
+    await engine.dispose()
+    print(f"{files} stored files referenced {references} times")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stored file reference counts")
+    parser.add_argument("command", choices=["recount"])
+    parser.parse_args()
+    asyncio.run(main())
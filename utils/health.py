@@ -0,0 +1,99 @@
+import asyncio
+import time
+from sqlalchemy import text
+from config import settings
+from database.db import engine
+from database.warmup import warmup_state, is_warm
+
+LOOP_LAG_INTERVAL = 0.25
+# Liveness fails when the monitor has not ticked for this many intervals,
+# e.g. because its task died or the loop is blocked outright.
+LOOP_STALE_INTERVALS = 8
+
+loop_state = {"lag_ms": 0.0, "last_tick": None}
+
+_probe_cache = {}
+_probe_locks = {}
+
+
+# Measures how late the event loop wakes up a sleeping task; a busy or
+# blocked loop shows up as lag long before requests start timing out.
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL):
+    loop = asyncio.get_running_loop()
+    loop_state["last_tick"] = loop.time()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        now = loop.time()
+        loop_state["lag_ms"] = round(max(0.0, now - started - interval) * 1000, 2)
+        loop_state["last_tick"] = now
+
+
+async def check_liveness() -> dict:
+    lag_ms = loop_state["lag_ms"]
+    last_tick = loop_state["last_tick"]
+    since_tick = None
+    stale = False
+    if last_tick is not None:
+        since_tick = asyncio.get_running_loop().time() - last_tick
+        stale = since_tick > LOOP_LAG_INTERVAL * LOOP_STALE_INTERVALS
+    return {
+        "ok": lag_ms <= settings.HEALTH_MAX_LOOP_LAG_MS and not stale,
+        "loop_lag_ms": lag_ms,
+        "max_loop_lag_ms": settings.HEALTH_MAX_LOOP_LAG_MS,
+        "since_last_tick_ms": None if since_tick is None else round(since_tick * 1000, 2),
+    }
+
+
+async def check_database() -> dict:
+    started = time.perf_counter()
+    try:
+        async def ping():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.wait_for(ping(), timeout=settings.HEALTH_DB_TIMEOUT_SECONDS)
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"pool checkout exceeded {settings.HEALTH_DB_TIMEOUT_SECONDS}s"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+async def check_readiness() -> dict:
+    database = await check_database()
+    warmup = {
+        "ok": is_warm(),
+        "done": warmup_state["done"],
+        "error": warmup_state["error"],
+        "attempts": warmup_state["attempts"],
+    }
+    pool = engine.pool
+    return {
+        "ok": database["ok"] and warmup["ok"],
+        "database": database,
+        "warmup": warmup,
+        "pool": {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        },
+    }
+
+
+# Probe results are shared for HEALTH_CACHE_SECONDS and concurrent callers
+# wait on the same check, so a burst of probes costs one pool checkout.
+async def cached_probe(name: str, check) -> dict:
+    now = time.monotonic()
+    cached = _probe_cache.get(name)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    lock = _probe_locks.setdefault(name, asyncio.Lock())
+    async with lock:
+        cached = _probe_cache.get(name)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        result = await check()
+        _probe_cache[name] = (time.monotonic() + settings.HEALTH_CACHE_SECONDS, result)
+        return result
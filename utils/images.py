@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from config import settings
+from utils.storage import get_storage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# Resized copies of uploaded images. For every stored image a process pool
+# writes each size below as WebP and in the original format (GIF as PNG),
+# next to the original:
+#
+#   resources/<name>.jpg -> resources/<name>_card.webp, resources/<name>_card.jpg, ...
+#
+# Derivative paths are derived from the original's path, so serializers can
+# expose them without extra columns. The thumbnail fallback is written (and
+# uploaded) last, so once it exists the whole set does; until then the
+# serializers point every size at the original.
+#
+#   python -m utils.images backfill [--dir resources/] [--force]
+#   python -m utils.images bench [--images 40] [--workers N]
+
+# name -> bounding box; images are scaled down to fit, never up.
+DERIVATIVE_SIZES = {
+    "zoom": (1600, 1600),
+    "card": (480, 480),
+    "thumbnail": (160, 160),
+}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+SAVE_OPTIONS = {
+    "WEBP": {"quality": 80, "method": 4},
+    "JPEG": {"quality": 85, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+}
+DERIVATIVE_PATTERN = re.compile(rf"_({'|'.join(DERIVATIVE_SIZES)})\.\w+$")
+
+
+def fallback_extension(ext: str) -> str:
+    ext = ext.lower()
+    return ".png" if ext == ".gif" else ext
+
+
+def derivative_path(path: str, size: str, webp: bool) -> str:
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_{size}{'.webp' if webp else fallback_extension(ext)}"
+
+
+def is_derivative(path: str) -> bool:
+    return DERIVATIVE_PATTERN.search(path) is not None
+
+
+def derivative_marker(path: str) -> str:
+    return derivative_path(path, list(DERIVATIVE_SIZES)[-1], False)
+
+
+def derivative_urls(path):
+    if not path or os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+        return None
+    if not derivatives_published(path):
+        return {size: {"webp": path, "original": path} for size in DERIVATIVE_SIZES}
+    return {
+        size: {"webp": derivative_path(path, size, True), "original": derivative_path(path, size, False)}
+        for size in DERIVATIVE_SIZES
+    }
+
+
+# Originals whose derivatives are known to be stored, oldest first. Local
+# files are checked with a stat; remote storage is asked in the background
+# (at most every PUBLISHED_RECHECK_SECONDS per image), and the original is
+# served until the answer comes back.
+PUBLISHED_CACHE_SIZE = 10000
+PUBLISHED_RECHECK_SECONDS = 30
+_published = {}
+_checked = {}
+
+
+def mark_published(path: str):
+    _published[path] = None
+    _checked.pop(path, None)
+    if len(_published) > PUBLISHED_CACHE_SIZE:
+        del _published[next(iter(_published))]
+
+
+def derivatives_published(path: str) -> bool:
+    if not derivatives_enabled():
+        return False
+    if path in _published:
+        return True
+    if get_storage().is_local:
+        if not os.path.exists(derivative_marker(path)):
+            return False
+        mark_published(path)
+        return True
+    check_published(path)
+    return False
+
+
+def check_published(path: str):
+    now = time.monotonic()
+    if now - _checked.get(path, -PUBLISHED_RECHECK_SECONDS) < PUBLISHED_RECHECK_SECONDS:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if len(_checked) >= PUBLISHED_CACHE_SIZE:
+        _checked.clear()
+    _checked[path] = now
+    task = loop.create_task(_check_published(path))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def _check_published(path: str):
+    try:
+        if await get_storage().exists(derivative_marker(path)):
+            mark_published(path)
+    except Exception as e:
+        logging.warning(f"Checking image derivatives for {path} failed: {e}")
+
+
+def save_image(image, path: str):
+    ext = os.path.splitext(path)[1].lower()
+    image_format = {".webp": "WEBP", ".png": "PNG"}.get(ext, "JPEG")
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    partial_path = f"{path}.part"
+    image.save(partial_path, image_format, **SAVE_OPTIONS[image_format])
+    os.replace(partial_path, path)
+
+
+# Runs in a pool worker. Sizes are produced largest first and each one is
+# resized from the previous, so the full-size original is scaled only once.
+def generate_derivatives(path: str, force: bool = False) -> int:
+    targets = {
+        size: [derivative_path(path, size, True), derivative_path(path, size, False)]
+        for size in DERIVATIVE_SIZES
+    }
+    if not force and all(os.path.exists(p) for paths in targets.values() for p in paths):
+        return 0
+
+    written = 0
+    with Image.open(path) as original:
+        # JPEG can decode at a reduced scale straight away.
+        original.draft("RGB", max(DERIVATIVE_SIZES.values()))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+        for size, box in DERIVATIVE_SIZES.items():
+            image = image.copy()
+            image.thumbnail(box, Image.Resampling.LANCZOS)
+            for target in targets[size]:
+                if force or not os.path.exists(target):
+                    save_image(image, target)
+                    written += 1
+    return written
+
+
+_pool = None
+_pending = set()
+
+
+def worker_count() -> int:
+    return settings.IMAGE_WORKERS or os.cpu_count() or 1
+
+
+# forkserver: forking the serving process itself would copy its event loop,
+# DB connections and thread locks into the workers.
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=worker_count(),
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def derivatives_enabled() -> bool:
+    return Image is not None and settings.IMAGE_DERIVATIVES_ENABLED
+
+
+async def _derive(path: str, after=None):
+    try:
+        await asyncio.get_running_loop().run_in_executor(get_pool(), generate_derivatives, path)
+    except Exception as e:
+        logging.warning(f"Generating image derivatives for {path} failed: {e}")
+    if after is not None:
+        await after(path)
+
+
+# Queues derivative generation for a freshly saved image without waiting
+# for it; the original is served until the derivatives exist. `after` is
+# awaited with the path once they have been written (or failed).
+def schedule_derivatives(path: str, after=None):
+    if not derivatives_enabled():
+        return
+    task = asyncio.create_task(_derive(path, after))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def iter_originals(root: str):
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_originals(entry.path)
+            elif (
+                os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+                and not is_derivative(entry.name)
+            ):
+                yield entry.path
+
+
+def run_pool(paths: list, workers: int, force: bool = False):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(partial(generate_derivatives, force=force), paths, chunksize=4))
+
+
+def backfill(root: str, workers: int, force: bool):
+    paths = list(iter_originals(root))
+    started = time.perf_counter()
+    written = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(generate_derivatives, path, force): path for path in paths}
+        for done, future in enumerate(futures, start=1):
+            try:
+                written += future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  failed: {futures[future]}: {e}")
+            if done % 100 == 0 or done == len(paths):
+                print(f"  {done}/{len(paths)} images, {written} derivatives written")
+    elapsed = time.perf_counter() - started
+    print(f"Backfilled {len(paths)} images ({failed} failed) in {elapsed:.1f}s with {workers} workers")
+
+
+def make_sample(path: str, width: int, height: int):
+    noise = Image.effect_noise((width // 4, height // 4), 40).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    Image.blend(gradient, noise.resize((width, height)), 0.4).save(path, "JPEG", quality=90)
+
+
+def bench(count: int, workers: int, width: int, height: int):
+    directory = tempfile.mkdtemp(prefix="image-bench-")
+    try:
+        sample = os.path.join(directory, "sample.jpg")
+        make_sample(sample, width, height)
+        results = {}
+        for pool_size in sorted({1, workers}):
+            paths = []
+            for i in range(count):
+                path = os.path.join(directory, f"{pool_size}-{i}.jpg")
+                shutil.copyfile(sample, path)
+                paths.append(path)
+            started = time.perf_counter()
+            run_pool(paths, pool_size)
+            elapsed = time.perf_counter() - started
+            results[pool_size] = count / elapsed
+            print(
+                f"{pool_size:>3} worker(s): {count} images {width}x{height} in {elapsed:.2f}s, "
+                f"{results[pool_size]:.1f} images/s, {results[pool_size] / pool_size:.1f} images/s/core"
+            )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if Image is None:
+        raise SystemExit("Pillow is not installed")
+
+    parser = argparse.ArgumentParser(description="Image derivative tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = commands.add_parser("backfill", help="generate missing derivatives for stored images")
+    backfill_parser.add_argument("--dir", default="resources/")
+    backfill_parser.add_argument("--workers", type=int, default=worker_count())
+    backfill_parser.add_argument("--force", action="store_true", help="regenerate existing derivatives")
+
+    bench_parser = commands.add_parser("bench", help="measure images processed per second per core")
+    bench_parser.add_argument("--images", type=int, default=40)
+    bench_parser.add_argument("--workers", type=int, default=worker_count())
+    bench_parser.add_argument("--width", type=int, default=3000)
+    bench_parser.add_argument("--height", type=int, default=2000)
+
+    args = parser.parse_args()
+    if args.command == "backfill":
+        backfill(args.dir, args.workers, args.force)
+    else:
+        bench(args.images, args.workers, args.width, args.height)
@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from config import APP_ROLES
+
+# Boots the app in a fresh interpreter with `-X importtime` for every
+# deployment role and reports boot time, peak RSS and the slowest imports.
+#
+#   python -m utils.import_profiler
+#   python -m utils.import_profiler --role storefront --top 30
+
+BOOT_SNIPPET = """
+import json, resource, sys, time
+start = time.perf_counter()
+import main
+boot_ms = (time.perf_counter() - start) * 1000
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({
+    "boot_ms": round(boot_ms, 1),
+    "rss_mb": round(rss_kb / 1024, 1),
+    "routes": len(main.app.routes),
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr: str):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+def summarize(rows, top: int):
+    slowest = sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.strip().split(".")[0]] += self_us
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    return {
+        "total_import_ms": round(sum(row[1] for row in rows) / 1000, 1),
+        "slowest_modules": [
+            {"module": name.strip(), "self_ms": round(s / 1000, 2), "cumulative_ms": round(c / 1000, 2)}
+            for name, s, c in slowest
+        ],
+        "packages": [{"package": name, "self_ms": round(us / 1000, 2)} for name, us in packages],
+    }
+
+
+def profile_role(role: str, top: int = 15) -> dict:
+    env = dict(os.environ, APP_ROLE=role)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT_SNIPPET],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"Booting role '{role}' failed:\n{tail}")
+
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report["role"] = role
+    report.update(summarize(parse_importtime(proc.stderr), top))
+    return report
+
+
+def print_report(report: dict):
+    print(f"== role: {report['role']} ==")
+    print(
+        f"boot {report['boot_ms']} ms | rss {report['rss_mb']} MB | "
+        f"routes {report['routes']} | modules {report['modules']} | imports {report['total_import_ms']} ms"
+    )
+    print("  slowest modules (cumulative):")
+    for row in report["slowest_modules"]:
+        print(f"    {row['cumulative_ms']:>9.2f} ms  {row['module']}")
+    print("  packages (self time):")
+    for row in report["packages"]:
+        print(f"    {row['self_ms']:>9.2f} ms  {row['package']}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time and boot profile per deployment role")
+    parser.add_argument("--role", choices=APP_ROLES, action="append", help="role to profile (repeatable)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print raw JSON reports")
+    args = parser.parse_args()
+
+    reports = [profile_role(role, args.top) for role in (args.role or APP_ROLES)]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for report in reports:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
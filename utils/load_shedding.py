@@ -0,0 +1,129 @@
+import math
+import time
+from starlette.responses import JSONResponse
+
+# Per route class concurrency limits. Each class adapts its limit with AIMD:
+# +1/limit per request that finishes under target latency, x backoff (at most
+# once per target interval) when a request is slow or fails. Requests over
+# the limit are shed straight away with 503 + Retry-After, so a browse spike
+# cannot queue on the DB pool in front of checkout.
+ROUTE_CLASSES = {
+    "catalog": {"initial": 20, "minimum": 4, "maximum": 30, "target_ms": 250},
+    "checkout": {"initial": 10, "minimum": 4, "maximum": 20, "target_ms": 800},
+    "admin": {"initial": 4, "minimum": 1, "maximum": 10, "target_ms": 1500},
+    "default": {"initial": 10, "minimum": 2, "maximum": 20, "target_ms": 500},
+    # Exports stream for as long as they take, so latency says nothing about
+    # overload; minimum == maximum makes this a plain concurrency cap.
+    "export": {"initial": 4, "minimum": 4, "maximum": 4, "target_ms": 60000},
+}
+
+CHECKOUT_PREFIXES = {
+    "orders", "order-items", "payments", "payment-methods", "cart", "cart-items", "cupons", "user-addresses",
+}
+ADMIN_PREFIXES = {"inventory", "vendors", "bank-details", "slider_type", "product-features"}
+# Reads are catalog traffic, writes are catalog management (admin).
+CATALOG_PREFIXES = {"products", "categories", "sub-categories", "brands", "best-sellers", "sliders", "feed"}
+# Reads are catalog traffic, writes come from ordinary shoppers (default).
+CUSTOMER_PREFIXES = {"reviews", "replies", "wishlist"}
+EXEMPT_PATHS = {"/", "/healthz", "/readyz", "/docs", "/redoc", "/openapi.json"}
+
+
+def classify_request(method: str, path: str):
+    if path in EXEMPT_PATHS or path.startswith("/resources/"):
+        return None
+
+    if path.endswith(":export"):
+        return "export"
+
+    # "/products:batch" belongs to the products class.
+    segment = path.strip("/").split("/", 1)[0]
+    prefix = segment.split(":", 1)[0]
+    read = method in ("GET", "HEAD")
+    if prefix in CHECKOUT_PREFIXES:
+        return "checkout"
+    if prefix in ADMIN_PREFIXES:
+        return "admin"
+    if prefix in CATALOG_PREFIXES:
+        return "catalog" if read else "admin"
+    if prefix in CUSTOMER_PREFIXES:
+        return "catalog" if read else "default"
+    # Listing, batching and exporting users is back office; /users/{id} is
+    # a shopper's own profile.
+    if prefix == "users":
+        return "admin" if path.rstrip("/") == "/users" or ":" in segment else "default"
+    return "default"
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial: int, minimum: int, maximum: int, target_ms: float, backoff: float = 0.9):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target = target_ms / 1000
+        self.backoff = backoff
+        self.in_flight = 0
+        self.avg_latency = self.target
+        self.last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float, failed: bool = False):
+        self.in_flight -= 1
+        self.avg_latency = 0.9 * self.avg_latency + 0.1 * latency
+
+        if failed or latency > self.target:
+            now = time.monotonic()
+            if now - self.last_decrease >= self.target:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self.last_decrease = now
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.avg_latency))
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(self, app, route_classes: dict = None):
+        self.app = app
+        self.limiters = {
+            name: AdaptiveLimiter(**config) for name, config in (route_classes or ROUTE_CLASSES).items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_request(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        if not limiter.try_acquire():
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry.", "route_class": route_class},
+                headers={"Retry-After": str(limiter.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.monotonic()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release(time.monotonic() - started, failed=status_code >= 500)
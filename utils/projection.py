@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import Optional
+from fastapi import HTTPException, Query
+from sqlalchemy.orm import load_only, raiseload
+
+# Loader options for endpoints that serialize a fixed set of fields.
+# Only `fields` of `model` are selected, the relationships passed in
+# `relationship_options` are loaded as given, and every other relationship
+# raises instead of being fetched behind the serializer's back.
+def projection(model, fields, *relationship_options):
+    columns = [getattr(model, name) for name in fields]
+    return [load_only(*columns), *relationship_options, raiseload("*")]
+
+
+def pick(obj, fields) -> dict:
+    return {name: getattr(obj, name) for name in fields}
+
+
+# `fields=` query parameter for list endpoints. Each route owns one instance
+# with the fields it can return; parsed field sets are cached per route so a
+# repeated `fields=` value costs a dict lookup. Returns None when the
+# parameter is absent, meaning "everything".
+class SparseFields:
+    def __init__(self, allowed, always=("id",)):
+        self.allowed = tuple(allowed)
+        self.always = tuple(always)
+        self.parse = lru_cache(maxsize=256)(self._parse)
+
+    def _parse(self, raw: str) -> tuple:
+        requested = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = sorted(set(requested) - set(self.allowed))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(self.allowed)}",
+            )
+        wanted = set(requested) | set(self.always)
+        # Keep the serializer's field order regardless of the request order.
+        return tuple(name for name in self.allowed if name in wanted)
+
+    def __call__(self, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+        if not fields:
+            return None
+        return self.parse(fields)
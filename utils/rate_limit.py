@@ -0,0 +1,114 @@
+import math
+import time
+from collections import OrderedDict
+from fastapi import HTTPException, Request, Response, status
+
+# Token bucket rate limiting for the abusable endpoints (login, password
+# reset, registration, search). Limits are written as "<count>/<period>",
+# e.g. "5/minute", and each route gets a per-IP and optionally a per-account
+# bucket.
+#
+# Buckets live in-process by default. A shared store (Redis, memcached...)
+# can be plugged in with set_backend() by implementing `take`.
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str):
+    count, _, period = rate.partition("/")
+    seconds = PERIODS.get(period.strip().rstrip("s"))
+    if not count.strip().isdigit() or seconds is None:
+        raise ValueError(f"Invalid rate '{rate}', expected '<count>/<second|minute|hour|day>'")
+    return int(count), seconds
+
+
+class RateLimitBackend:
+    # Consume one token; return (allowed, remaining, seconds_until_full).
+    async def take(self, key: str, capacity: int, period: float):
+        raise NotImplementedError
+
+
+class InMemoryBackend(RateLimitBackend):
+    def __init__(self, sweep_interval: float = 60.0, max_keys: int = 100_000):
+        # key -> (tokens, last_refill, full_at), least recently used first.
+        # A bucket that has refilled completely carries no information and is
+        # dropped on the next sweep; past max_keys the oldest bucket is evicted
+        # on insert, so a flood of unique keys costs O(1) per request.
+        self.buckets = OrderedDict()
+        self.sweep_interval = sweep_interval
+        self.max_keys = max_keys
+        self.next_sweep = time.monotonic() + sweep_interval
+
+    def sweep(self, now: float):
+        expired = [key for key, bucket in self.buckets.items() if bucket[2] <= now]
+        for key in expired:
+            del self.buckets[key]
+        self.next_sweep = now + self.sweep_interval
+
+    async def take(self, key: str, capacity: int, period: float):
+        now = time.monotonic()
+        if now >= self.next_sweep:
+            self.sweep(now)
+
+        rate = capacity / period
+        bucket = self.buckets.pop(key, None)
+        tokens, last, _ = bucket or (capacity, now, now)
+        tokens = min(capacity, tokens + (now - last) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        seconds_until_full = (capacity - tokens) / rate
+        if bucket is None and len(self.buckets) >= self.max_keys:
+            self.buckets.popitem(last=False)
+        self.buckets[key] = (tokens, now, now + seconds_until_full)
+        return allowed, int(tokens), seconds_until_full
+
+
+backend: RateLimitBackend = InMemoryBackend()
+
+
+def set_backend(new_backend: RateLimitBackend):
+    global backend
+    backend = new_backend
+
+
+# request.client.host is the X-Forwarded-For address only when the peer is
+# listed in SERVER_TRUSTED_PROXIES (server.py), so clients cannot pick it.
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    def __init__(self, name: str, per_ip: str, per_account: str = None):
+        self.name = name
+        self.per_ip = parse_rate(per_ip)
+        self.per_account = parse_rate(per_account) if per_account else None
+
+    async def hit(self, key: str, limit, response: Response = None):
+        capacity, period = limit
+        allowed, remaining, reset = await backend.take(f"{self.name}:{key}", capacity, period)
+        headers = {
+            "RateLimit-Limit": str(capacity),
+            "RateLimit-Remaining": str(remaining),
+            "RateLimit-Reset": str(math.ceil(reset)),
+        }
+        if not allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(period / capacity)))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later.",
+                headers=headers,
+            )
+        if response is not None:
+            response.headers.update(headers)
+
+    # Used as a route dependency: limits by client IP.
+    async def __call__(self, request: Request, response: Response):
+        await self.hit(f"ip:{client_ip(request)}", self.per_ip, response)
+
+    # Called from the handler once the account identifier has been parsed.
+    async def hit_account(self, account: str, response: Response = None):
+        if self.per_account:
+            await self.hit(f"account:{account.strip().lower()}", self.per_account, response)
@@ -1,20 +1,209 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
 import os
-import uuid
+import tempfile
+import time
+from contextvars import ContextVar
+from typing import Optional
 from fastapi import HTTPException, UploadFile
 import aiofiles
+from config import settings
+from utils.images import (
+    DERIVATIVE_SIZES, derivative_marker, derivative_path, derivatives_enabled, mark_published, schedule_derivatives,
+)
+from utils.storage import get_storage
 
 UPLOAD_DIR = "resources/"
 
-async def save_file(file: UploadFile, folder: str = UPLOAD_DIR) -> str:
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(status_code=400, detail="File must be an image.")
-    os.makedirs(folder, exist_ok=True)
-    ext = os.path.splitext(file.filename)[-1]
-    filename = f"{uuid.uuid4().hex}{ext}"
-    path = os.path.join(folder, filename)
-
-    async with aiofiles.open(path, "wb") as out_file:
-        content = await file.read()
-        await out_file.write(content)
-    await file.close()
-    return path
\ No newline at end of file
+# Uploads are streamed to disk UPLOAD_CHUNK_SIZE bytes at a time and cut off
+# at UPLOAD_MAX_BYTES. The type is sniffed from the first bytes rather than
+# trusted from the client's Content-Type or file name, and the extension is
+# taken from what was detected.
+#
+# Files are content addressed: the name is a hash of the bytes, computed
+# while streaming, so uploading the same image again reuses the stored file
+# (and its derivatives) instead of adding a copy. utils/file_refs.py counts
+# the rows referring to each file. Where the file is kept is up to the
+# storage driver (utils/storage.py); the returned key is the same for all.
+IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+DOCUMENT_TYPES = IMAGE_TYPES | {"application/pdf"}
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "application/pdf": ".pdf",
+}
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    return None
+
+
+# Bytes and time spent saving uploads in the current request, reported by
+# UploadStatsMiddleware.
+upload_stats: ContextVar[Optional[dict]] = ContextVar("upload_stats", default=None)
+
+
+def record_upload(size: int, started: float, finished: float):
+    stats = upload_stats.get()
+    if stats is not None:
+        stats["files"] += 1
+        stats["bytes"] += size
+        stats["started"] = min(stats["started"] or started, started)
+        stats["finished"] = max(stats["finished"], finished)
+
+
+async def save_file(file: UploadFile, folder: str = UPLOAD_DIR, allowed_types: set = IMAGE_TYPES) -> str:
+    if file.size is not None and file.size > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"File is larger than {settings.UPLOAD_MAX_BYTES} bytes.")
+
+    started = time.perf_counter()
+    head = await file.read(settings.UPLOAD_CHUNK_SIZE)
+    content_type = sniff_content_type(head)
+    if content_type not in allowed_types:
+        raise HTTPException(
+            status_code=400,
+            detail="File must be an image." if allowed_types == IMAGE_TYPES else "Unsupported file type.",
+        )
+
+    storage = get_storage()
+    spool_dir = folder if storage.is_local else (settings.UPLOAD_SPOOL_DIR or tempfile.gettempdir())
+    os.makedirs(spool_dir, exist_ok=True)
+    partial = os.path.join(spool_dir, f"{os.urandom(8).hex()}.part")
+    digest = hashlib.blake2b(digest_size=16)
+
+    size = 0
+    try:
+        async with aiofiles.open(partial, "wb") as out_file:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > settings.UPLOAD_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=413, detail=f"File is larger than {settings.UPLOAD_MAX_BYTES} bytes."
+                    )
+                digest.update(chunk)
+                await out_file.write(chunk)
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+
+        path = os.path.join(folder, f"{digest.hexdigest()}{EXTENSIONS[content_type]}")
+        duplicate = await storage.reuse(path)
+        derive = content_type in IMAGE_TYPES and not duplicate and derivatives_enabled()
+        if duplicate:
+            os.remove(partial)
+        elif storage.is_local or not derive:
+            await storage.put_file(path, partial, content_type)
+        else:
+            # Kept in the spool under its key until the derivatives are made from it.
+            spooled = os.path.join(spool_dir, path)
+            os.makedirs(os.path.dirname(spooled), exist_ok=True)
+            os.replace(partial, spooled)
+            partial = spooled
+            await storage.put_file(path, spooled, content_type, keep=True)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        await file.close()
+
+    record_upload(size, started, time.perf_counter())
+    if derive:
+        if storage.is_local:
+            schedule_derivatives(path)
+        else:
+            schedule_derivatives(partial, lambda spooled: publish_derivatives(spool_dir, spooled))
+    return path
+
+
+# Uploads the derivatives of a spooled image to remote storage and clears
+# the spool. The marker (see utils/images.py) goes up last, and only after
+# the rest of the set was stored, so a failed or partial set is never served.
+async def publish_derivatives(spool_dir: str, spooled: str):
+    files = [
+        derivative_path(spooled, size, webp)
+        for size in DERIVATIVE_SIZES
+        for webp in (True, False)
+    ]
+    marker = derivative_marker(spooled)
+    key = os.path.relpath(spooled, spool_dir)
+    try:
+        if not all(os.path.exists(f) for f in files):
+            logging.warning(f"Derivatives of {spooled} are incomplete, not publishing them")
+            return
+        storage = get_storage()
+        await storage.put_many(
+            [(os.path.relpath(f, spool_dir), f, mimetypes.guess_type(f)[0]) for f in files if f != marker]
+        )
+        await storage.put_file(os.path.relpath(marker, spool_dir), marker, mimetypes.guess_type(marker)[0])
+        mark_published(key)
+    except Exception as e:
+        logging.warning(f"Uploading derivatives of {spooled} failed: {e}")
+    finally:
+        for f in (spooled, *files):
+            if os.path.exists(f):
+                os.remove(f)
+
+
+# Saves several uploads concurrently, at most UPLOAD_CONCURRENCY at a time.
+# Returns the paths in order, None for missing files.
+async def save_files(
+    files: list,
+    folder: str = UPLOAD_DIR,
+    allowed_types: set = IMAGE_TYPES
+) -> list:
+    semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+
+    async def save(file):
+        if file is None:
+            return None
+        async with semaphore:
+            return await save_file(file, folder, allowed_types)
+
+    return list(await asyncio.gather(*(save(file) for file in files)))
+
+
+# Adds a Server-Timing entry with the upload throughput to responses of
+# requests that saved files, and logs it.
+class UploadStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        stats = {"files": 0, "bytes": 0, "started": 0.0, "finished": 0.0}
+        token = upload_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and stats["files"]:
+                elapsed = max(stats["finished"] - stats["started"], 1e-6)
+                mb_per_second = stats["bytes"] / 1024 / 1024 / elapsed
+                logging.info(
+                    f"{scope['path']}: saved {stats['files']} file(s), {stats['bytes']} bytes "
+                    f"in {elapsed * 1000:.1f} ms ({mb_per_second:.1f} MB/s)"
+                )
+                timing = f'upload;dur={elapsed * 1000:.1f};desc="{stats["files"]} files, {mb_per_second:.1f} MB/s"'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            upload_stats.reset(token)
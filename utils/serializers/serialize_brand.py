@@ -1,8 +1,12 @@
+from utils.images import derivative_urls
+
+
 def serialize_brand(brand):
     return {
         "id": brand.id,
         "name": brand.name,
         "description": brand.description,
         "image": brand.image,
+        "image_variants": derivative_urls(brand.image),
         "is_active": brand.is_active
     }
\ No newline at end of file
@@ -1,4 +1,23 @@
-def serialize_order(order):
+from sqlalchemy.orm import selectinload
+from models.order_items.order_items import OrderItems
+from models.products.products import Products
+
+ORDER_ITEM_FIELDS = ("id", "order_id", "product_id", "quantity", "cost")
+ORDER_FIELDS = (
+    "id", "total_amount", "is_paid", "status", "delivery_status", "delivery_charge",
+    "placed_at", "user_id", "shipping_address_id",
+)
+
+
+# serialize_order_item reads nothing from the product but its image.
+def order_item_product_option():
+    return selectinload(OrderItems.products).load_only(Products.highlighted_image).raiseload("*")
+
+
+def serialize_order(order, fields: tuple = None):
+    if fields is not None:
+        return {name: getattr(order, name) for name in fields}
+
     return {
         "id": order.id,
         "total_amount": order.total_amount,
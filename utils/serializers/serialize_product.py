@@ -1,6 +1,41 @@
 from models.products.products import Products
+from utils.images import derivative_urls
+
+
+def product_features(product: Products) -> list:
+    return [
+        {
+            "id": f.id,
+            "name": f.name,
+            "unit": f.unit,
+            "value": f.value
+        }
+        for f in product.product_specific_features
+    ]
+
+
+def product_image_variants(product: Products) -> dict:
+    return {
+        "highlighted_image": derivative_urls(product.highlighted_image),
+        "images": [derivative_urls(image) for image in product.images or []],
+    }
+
+
+# Output fields that are not read straight off a Products column.
+PRODUCT_COMPUTED_FIELDS = {
+    "discount_type": lambda product: product.discount_type.value if product.discount_type else None,
+    "product_specific_features": product_features,
+    "image_variants": product_image_variants,
+}
+
+
+def serialize_product(product: Products, fields: tuple = None) -> dict:
+    if fields is not None:
+        return {
+            name: PRODUCT_COMPUTED_FIELDS[name](product) if name in PRODUCT_COMPUTED_FIELDS else getattr(product, name)
+            for name in fields
+        }
 
-def serialize_product(product: Products) -> dict:
     return {
         "id": product.id,
         "name": product.name,
@@ -13,29 +48,25 @@ def serialize_product(product: Products) -> dict:
         "discount_amount": product.discount_amount,
         "is_active": product.is_active,
         "sub_category_id": product.sub_category_id,
-        "category_id": (
-            product.sub_categories.category_id
-            if product.sub_categories and product.sub_categories.category_id
-            else None
-        ),
+        "category_id": product.category_id,
         "brand_id": product.brand_id,
         "vendor_id": product.vendor_id,
         "slug": product.slug,
         "images": product.images,
         "highlighted_image": product.highlighted_image,
+        "image_variants": product_image_variants(product),
         "total_stock": product.total_stock,
         "available_stock": product.available_stock,
         "quantity_sold": product.quantity_sold,
         "created_at": product.created_at,
         "updated_at": product.updated_at,
-        "product_specific_features": [
-            {
-                "id": f.id,
-                "name": f.name,
-                "unit": f.unit,
-                "value": f.value
-            }
-            for f in product.product_specific_features
-        ],
+        "product_specific_features": product_features(product),
     }
 
+
+PRODUCT_FIELDS = (
+    "id", "name", "description", "meta_title", "meta_description", "price", "payable_price",
+    "discount_type", "discount_amount", "is_active", "sub_category_id", "category_id", "brand_id",
+    "vendor_id", "slug", "images", "highlighted_image", "image_variants", "total_stock", "available_stock",
+    "quantity_sold", "created_at", "updated_at", "product_specific_features",
+)
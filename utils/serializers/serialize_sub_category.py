@@ -1,4 +1,5 @@
 from models.sub_categories.sub_categories import SubCategories
+from utils.images import derivative_urls
 
 def serialize_sub_category(sc: SubCategories) -> dict:
     return {
@@ -9,6 +10,7 @@ def serialize_sub_category(sc: SubCategories) -> dict:
         "meta_title": sc.meta_title,
         "meta_description": sc.meta_description,
         "image": sc.image,
+        "image_variants": derivative_urls(sc.image),
         "feature_ids": [f.id for f in sc.product_features],
         "is_active": sc.is_active,
         "created_at": getattr(sc, "created_at", None)  # in case created_at is not always loaded
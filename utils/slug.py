@@ -1,7 +1,11 @@
 import re
 from unidecode import unidecode
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, or_, and_, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
+
+SLUG_ATTEMPTS = 3
 
 def slugify(text: str) -> str:
     text = text.lower()
@@ -10,23 +14,92 @@ def slugify(text: str) -> str:
     return text
 
 
+# ASCII, lowercase, dash separated; the part unique slugs are numbered from.
+def slug_base(name: str) -> str:
+    slug = unidecode(name.lower())
+    slug = re.sub(r'[^a-z0-9]+', '-', slug).strip('-')
+    return re.sub(r'[-]+', '-', slug)
+
+
+# Unique slugs for several names with one query: every existing base or
+# base-N slug is fetched at once and the first free one is picked per name,
+# counting the slugs handed out earlier in the same call. exclude_id skips
+# the row being renamed so it can keep its own slug.
+async def generate_unique_slugs(
+    db: AsyncSession,
+    names: list,
+    model,
+    slug_field: str = "slug",
+    exclude_id: int = None
+) -> list:
+    column = getattr(model, slug_field)
+    bases = [slug_base(name) for name in names]
+
+    # Bases only contain [a-z0-9-], so they are safe in LIKE and regex patterns.
+    query = select(column).where(or_(*(
+        or_(column == base, and_(column.like(f"{base}-%"), column.regexp_match(f"^{base}-[0-9]+$")))
+        for base in dict.fromkeys(bases)
+    )))
+    if exclude_id is not None:
+        query = query.where(model.id != exclude_id)
+
+    with db.no_autoflush:
+        result = await db.execute(query)
+    taken = set(result.scalars().all())
+
+    slugs = []
+    for base in bases:
+        slug = base
+        counter = 1
+        while slug in taken:
+            slug = f"{base}-{counter}"
+            counter += 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
 async def generate_unique_slug(
     db: AsyncSession,
     name: str,
     model,
-    slug_field: str = "slug"
+    slug_field: str = "slug",
+    exclude_id: int = None
 ):
-    slug = unidecode(name.lower())
-    slug = re.sub(r'[^a-z0-9]+', '-', slug).strip('-')
-    slug = re.sub(r'[-]+', '-', slug)
-
-    counter = 1
-    original_slug = slug
-
-    while True:
-        column = getattr(model, slug_field)
-        result = await db.execute(select(model).where(column == slug))
-        if not result.scalar_one_or_none():
-            return slug
-        slug = f"{original_slug}-{counter}"
-        counter += 1
+    return (await generate_unique_slugs(db, [name], model, slug_field, exclude_id))[0]
+
+
+# Sets a unique slug on obj and flushes it. The flush runs in a savepoint so
+# that when a concurrent request takes the same slug between the lookup and
+# the insert, the unique violation only undoes this attempt and a fresh slug
+# is tried. Other pending changes of a persistent obj are flushed first, in
+# the outer transaction. Rolling back the savepoint expires obj, so those
+# flushed values are put back as its loaded state before the retry; an
+# async session cannot reload them implicitly.
+async def flush_with_unique_slug(db: AsyncSession, obj, name: str, slug_field: str = "slug"):
+    model = type(obj)
+    state = inspect(obj)
+    persistent = state.persistent
+    if persistent:
+        await db.flush()
+    obj_id = obj.id if persistent else None
+    values = {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict and attr.key != slug_field
+    }
+
+    for attempt in range(1, SLUG_ATTEMPTS + 1):
+        slug = await generate_unique_slug(db, name, model, slug_field, exclude_id=obj_id)
+        try:
+            async with db.begin_nested():
+                setattr(obj, slug_field, slug)
+                db.add(obj)
+                await db.flush()
+            return
+        except IntegrityError as e:
+            if attempt == SLUG_ATTEMPTS or slug_field not in str(e.orig):
+                raise
+            if persistent:
+                for key, value in values.items():
+                    set_committed_value(obj, key, value)
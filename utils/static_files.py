@@ -0,0 +1,285 @@
+import errno
+import mimetypes
+import os
+import re
+import stat
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from utils.compression import accepted_encodings
+from config import settings
+
+# Serving for /resources. On top of StaticFiles:
+#
+# - Content addressed names (<32 hex>.<ext> and their _<size> derivatives)
+#   never change, so they are sent with a one year immutable Cache-Control
+#   and browsers stop revalidating them. Other files get STATIC_MAX_AGE.
+# - Single byte ranges are answered with 206.
+# - A precompressed <file>.br / <file>.gz next to a file is sent instead when
+#   the client accepts that encoding.
+# - Open file descriptors of hot files are kept in an LRU, so a cached hit
+#   costs no open()/stat(). Bodies are read with pread in a worker thread.
+#   Servers that implement the http.response.pathsend extension send whole
+#   files themselves (sendfile); behind nginx, STATIC_ACCEL_REDIRECT hands
+#   the file over with X-Accel-Redirect instead.
+
+IMMUTABLE_NAME = re.compile(r"^[0-9a-f]{32}(_[a-z]+)?\.[0-9a-z]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Reads up to this size are done on the event loop; for a hot file they come
+# from the page cache and a thread hop would cost more than the read.
+INLINE_READ_SIZE = 64 * 1024
+CHUNK_SIZE = 256 * 1024
+
+
+class OpenFile:
+    __slots__ = ("path", "fd", "size", "mtime", "identity", "etag", "variants", "checked_at", "users", "cached")
+
+    def __init__(self, path: str, fd: int, stat_result, variants: dict):
+        self.path = path
+        self.fd = fd
+        self.size = stat_result.st_size
+        self.mtime = stat_result.st_mtime
+        self.identity = (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+        self.etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+        self.variants = variants
+        self.checked_at = time.monotonic()
+        self.users = 0
+        self.cached = True
+
+
+# LRU of open descriptors. Entries are revalidated with a stat() every
+# revalidate_seconds, so replaced or deleted files are noticed. A descriptor
+# is closed only once it is out of the cache and no response is reading it.
+class FileHandleCache:
+    def __init__(self, max_files: int, revalidate_seconds: float):
+        self.max_files = max_files
+        self.revalidate_seconds = revalidate_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def acquire(self, path: str, variants: bool = True) -> OpenFile:
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and time.monotonic() - entry.checked_at < self.revalidate_seconds:
+                self.entries.move_to_end(path)
+                entry.users += 1
+                return entry
+
+        stat_result = os.stat(path)
+        if entry is not None and entry.identity == (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns):
+            with self.lock:
+                entry.checked_at = time.monotonic()
+                if entry.cached:
+                    entry.users += 1
+                    return entry
+
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise IsADirectoryError(errno.EISDIR, "Not a file", path)
+        fd = os.open(path, os.O_RDONLY)
+        found = {}
+        if variants:
+            found = {encoding: path + suffix for encoding, suffix in PRECOMPRESSED if os.path.isfile(path + suffix)}
+        entry = OpenFile(path, fd, os.fstat(fd), found)
+
+        with self.lock:
+            entry.users += 1
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.retire(old)
+            self.entries[path] = entry
+            while len(self.entries) > self.max_files:
+                _, evicted = self.entries.popitem(last=False)
+                self.retire(evicted)
+        return entry
+
+    def retire(self, entry: OpenFile):
+        entry.cached = False
+        if entry.users == 0:
+            os.close(entry.fd)
+
+    def release(self, entry: OpenFile):
+        with self.lock:
+            entry.users -= 1
+            if not entry.cached and entry.users == 0:
+                os.close(entry.fd)
+
+
+# (start, end) of a single byte range, None to send the whole file.
+# Raises ValueError when the range cannot be satisfied.
+def parse_range(value: str, size: int):
+    match = BYTE_RANGE.match(value.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError(value)
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError(value)
+    if end < start:
+        return None
+    return start, end
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class FileBodyResponse:
+    def __init__(self, handles: FileHandleCache, entry: OpenFile, status_code: int, headers: dict, start: int, length: int, head: bool):
+        self.handles = handles
+        self.entry = entry
+        self.status_code = status_code
+        self.headers = headers
+        self.start = start
+        self.length = length
+        self.head = head
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in self.headers.items()],
+            })
+            if self.head or self.length == 0:
+                await send({"type": "http.response.body", "body": b""})
+            elif "http.response.pathsend" in scope.get("extensions", {}) and self.length == self.entry.size:
+                await send({"type": "http.response.pathsend", "path": os.path.abspath(self.entry.path)})
+            else:
+                await self.send_body(send)
+        finally:
+            self.handles.release(self.entry)
+
+    async def send_body(self, send):
+        offset = self.start
+        remaining = self.length
+        while remaining:
+            size = min(CHUNK_SIZE, remaining)
+            if size <= INLINE_READ_SIZE:
+                chunk = os.pread(self.entry.fd, size, offset)
+            else:
+                chunk = await anyio.to_thread.run_sync(os.pread, self.entry.fd, size, offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining:
+            # The file shrank under us; end the response rather than hang.
+            await send({"type": "http.response.body", "body": b""})
+
+
+class StaticFileServer(StaticFiles):
+    def __init__(self, directory: str):
+        super().__init__(directory=directory)
+        self.root = os.path.realpath(directory)
+        self.handles = FileHandleCache(settings.STATIC_OPEN_FILES, settings.STATIC_REVALIDATE_SECONDS)
+
+    def open(self, path: str, variants: bool = True) -> OpenFile:
+        full_path = os.path.join(self.root, path)
+        if os.path.commonpath([self.root, os.path.realpath(full_path)]) != self.root:
+            raise FileNotFoundError(errno.ENOENT, "Outside of the static directory", path)
+        return self.handles.acquire(full_path, variants)
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        name = os.path.basename(path)
+        cache_control = (
+            IMMUTABLE_CACHE_CONTROL if IMMUTABLE_NAME.match(name) else f"public, max-age={settings.STATIC_MAX_AGE}"
+        )
+        if settings.STATIC_ACCEL_REDIRECT:
+            return Response(headers={
+                "x-accel-redirect": f"{settings.STATIC_ACCEL_REDIRECT.rstrip('/')}/{path}",
+                "cache-control": cache_control,
+            })
+
+        try:
+            entry = await anyio.to_thread.run_sync(self.open, path)
+        except PermissionError:
+            raise HTTPException(status_code=401)
+        except OSError:
+            raise HTTPException(status_code=404)
+
+        try:
+            return await self.file_body(entry, name, cache_control, scope)
+        except BaseException:
+            self.handles.release(entry)
+            raise
+
+    async def file_body(self, entry: OpenFile, name: str, cache_control: str, scope):
+        request_headers = Headers(scope=scope)
+        range_header = request_headers.get("range")
+        mtime = entry.mtime
+        headers = {
+            "content-type": mimetypes.guess_type(name)[0] or "application/octet-stream",
+            "accept-ranges": "bytes",
+            "cache-control": cache_control,
+            "etag": entry.etag,
+            "last-modified": formatdate(mtime, usegmt=True),
+        }
+        if entry.variants:
+            headers["vary"] = "Accept-Encoding"
+
+        # Ranges always refer to the identity encoding, so variants are only
+        # used for requests without one. A variant is tagged with the
+        # identity ETag plus its encoding, which keeps conditional requests
+        # from mixing up the encodings.
+        accepted = accepted_encodings(request_headers.get("accept-encoding", "")) if entry.variants and not range_header else ()
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding in accepted and encoding in entry.variants:
+                try:
+                    variant = await anyio.to_thread.run_sync(self.handles.acquire, entry.variants[encoding], False)
+                except OSError:
+                    continue
+                self.handles.release(entry)
+                entry = variant
+                headers["content-encoding"] = encoding
+                headers["etag"] = f'{headers["etag"][:-1]}-{suffix[1:]}"'
+                break
+
+        if self.not_modified(request_headers, headers["etag"], mtime):
+            self.handles.release(entry)
+            return Response(status_code=304, headers={k: headers[k] for k in ("cache-control", "etag", "vary") if k in headers})
+
+        if range_header and request_headers.get("if-range", entry.etag) == entry.etag:
+            try:
+                byte_range = parse_range(range_header, entry.size)
+            except ValueError:
+                self.handles.release(entry)
+                return Response(status_code=416, headers={"content-range": f"bytes */{entry.size}"})
+            if byte_range is not None:
+                start, end = byte_range
+                headers["content-range"] = f"bytes {start}-{end}/{entry.size}"
+                headers["content-length"] = str(end - start + 1)
+                return FileBodyResponse(self.handles, entry, 206, headers, start, end - start + 1, scope["method"] == "HEAD")
+
+        headers["content-length"] = str(entry.size)
+        return FileBodyResponse(self.handles, entry, 200, headers, 0, entry.size, scope["method"] == "HEAD")
+
+    def not_modified(self, request_headers: Headers, etag: str, mtime: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import quote
+import aiofiles
+import httpx
+from config import settings
+
+# Where uploads end up. save_files streams every upload to a local spool
+# file and hands it to the configured driver under its key, which is also
+# the value stored in the DB ("resources/<hash>.jpg"):
+#
+#   STORAGE_DRIVER=local  files stay on this host and /resources serves them
+#   STORAGE_DRIVER=s3     files go to an S3 compatible bucket (AWS, MinIO,
+#                         R2...), /resources/<key> redirects to the bucket
+#
+# The S3 driver talks to the REST API over httpx and signs requests with
+# SigV4 itself. Large files are sent as multipart uploads with
+# S3_CONCURRENCY parts in flight. docker-compose.s3.yml starts a local MinIO.
+
+
+class Storage:
+    is_local = False
+
+    # True when the key is already stored. The local driver also touches the
+    # file so the orphan GC's grace period starts over; the GC only sweeps
+    # local storage, so remote drivers just check.
+    async def reuse(self, key: str) -> bool:
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    # Stores a local file under key. The file is consumed unless keep is set
+    # (remote drivers only).
+    async def put_file(self, key: str, path: str, content_type: str = None, keep: bool = False):
+        raise NotImplementedError
+
+    async def put_many(self, items: list):
+        semaphore = asyncio.Semaphore(settings.S3_CONCURRENCY)
+
+        async def put(key, path, content_type):
+            async with semaphore:
+                await self.put_file(key, path, content_type)
+
+        await asyncio.gather(*(put(*item) for item in items))
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    # URL clients can fetch the file from directly.
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+    def presigned_url(self, key: str, expires: int = None, method: str = "GET") -> str:
+        return self.url(key)
+
+    async def close(self):
+        pass
+
+
+class LocalStorage(Storage):
+    is_local = True
+
+    async def reuse(self, key: str) -> bool:
+        if not os.path.exists(key):
+            return False
+        os.utime(key)
+        return True
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(key)
+
+    async def put_file(self, key: str, path: str, content_type: str = None, keep: bool = False):
+        os.makedirs(os.path.dirname(key) or ".", exist_ok=True)
+        os.replace(path, key)
+
+    async def delete(self, key: str):
+        if os.path.exists(key):
+            os.remove(key)
+
+    def url(self, key: str) -> str:
+        return f"{settings.BASE_URL.rstrip('/')}/{quote(key)}"
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hmac_sha256(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def canonical_query(params: dict) -> str:
+    return "&".join(
+        f"{quote(str(k), safe='-_.~')}={quote(str(v), safe='-_.~')}" for k, v in sorted(params.items())
+    )
+
+
+class SigV4:
+    def __init__(self, access_key: str, secret_key: str, region: str, service: str = "s3"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+
+    def scope(self, date: str) -> str:
+        return f"{date}/{self.region}/{self.service}/aws4_request"
+
+    def signature(self, method: str, path: str, query: dict, headers: dict, payload_hash: str, now: datetime) -> str:
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = now.strftime("%Y%m%d")
+        names = sorted(name.lower() for name in headers)
+        lowered = {name.lower(): str(value).strip() for name, value in headers.items()}
+        canonical_request = "\n".join((
+            method,
+            quote(path, safe="/-_.~"),
+            canonical_query(query),
+            "".join(f"{name}:{lowered[name]}\n" for name in names),
+            ";".join(names),
+            payload_hash,
+        ))
+        string_to_sign = "\n".join((
+            "AWS4-HMAC-SHA256", amz_date, self.scope(date), sha256_hex(canonical_request.encode()),
+        ))
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (date, self.region, self.service, "aws4_request"):
+            key = hmac_sha256(key, part)
+        return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    def sign_headers(self, method: str, host: str, path: str, query: dict, payload_hash: str, now: datetime = None) -> dict:
+        now = now or datetime.now(timezone.utc)
+        headers = {"host": host, "x-amz-content-sha256": payload_hash, "x-amz-date": now.strftime("%Y%m%dT%H%M%SZ")}
+        signature = self.signature(method, path, query, headers, payload_hash, now)
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{self.scope(now.strftime('%Y%m%d'))}, "
+            f"SignedHeaders={';'.join(sorted(headers))}, Signature={signature}"
+        )
+        del headers["host"]
+        return headers
+
+    def presign_query(self, method: str, host: str, path: str, expires: int, now: datetime = None) -> dict:
+        now = now or datetime.now(timezone.utc)
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{self.scope(now.strftime('%Y%m%d'))}",
+            "X-Amz-Date": now.strftime("%Y%m%dT%H%M%SZ"),
+            "X-Amz-Expires": str(expires),
+            "X-Amz-SignedHeaders": "host",
+        }
+        query["X-Amz-Signature"] = self.signature(method, path, query, {"host": host}, "UNSIGNED-PAYLOAD", now)
+        return query
+
+
+UPLOAD_ID = re.compile(rb"<UploadId>([^<]+)</UploadId>")
+
+
+class S3Storage(Storage):
+    def __init__(self, endpoint_url: str, bucket: str, access_key: str, secret_key: str, region: str, public_url: str = ""):
+        self.endpoint = httpx.URL(endpoint_url)
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self.signer = SigV4(access_key, secret_key, region)
+        self.client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0))
+
+    @property
+    def host(self) -> str:
+        return self.endpoint.netloc.decode()
+
+    # Path style addressing, which every S3 compatible server supports.
+    def object_path(self, key: str) -> str:
+        return f"{self.endpoint.path.rstrip('/')}/{self.bucket}/{key}"
+
+    async def request(self, method: str, key: str, query: dict = None, content=None, headers: dict = None):
+        query = query or {}
+        path = self.object_path(key)
+        payload_hash = sha256_hex(content) if isinstance(content, bytes) else "UNSIGNED-PAYLOAD"
+        signed = self.signer.sign_headers(method, self.host, path, query, payload_hash)
+        url = self.endpoint.copy_with(raw_path=(quote(path, safe="/-_.~") + (f"?{canonical_query(query)}" if query else "")).encode())
+        response = await self.client.request(method, url, content=content, headers={**(headers or {}), **signed})
+        if response.status_code >= 400 and not (method == "HEAD" and response.status_code == 404):
+            raise httpx.HTTPStatusError(
+                f"S3 {method} {key} failed with {response.status_code}: {response.text[:200]}",
+                request=response.request,
+                response=response,
+            )
+        return response
+
+    async def reuse(self, key: str) -> bool:
+        response = await self.request("HEAD", key)
+        return response.status_code == 200
+
+    async def exists(self, key: str) -> bool:
+        response = await self.request("HEAD", key)
+        return response.status_code == 200
+
+    async def put_file(self, key: str, path: str, content_type: str = None, keep: bool = False):
+        headers = {"content-type": content_type} if content_type else {}
+        try:
+            if os.path.getsize(path) > settings.S3_MULTIPART_THRESHOLD:
+                await self.put_multipart(key, path, headers)
+            else:
+                async with aiofiles.open(path, "rb") as f:
+                    await self.request("PUT", key, content=await f.read(), headers=headers)
+        finally:
+            if not keep:
+                os.remove(path)
+
+    async def put_multipart(self, key: str, path: str, headers: dict):
+        response = await self.request("POST", key, {"uploads": ""}, headers=headers)
+        upload_id = UPLOAD_ID.search(response.content).group(1).decode()
+
+        size = os.path.getsize(path)
+        part_size = settings.S3_PART_SIZE
+        semaphore = asyncio.Semaphore(settings.S3_CONCURRENCY)
+
+        # Each part reads its own slice, so at most S3_CONCURRENCY parts are
+        # held in memory.
+        async def upload_part(number: int):
+            async with semaphore:
+                async with aiofiles.open(path, "rb") as f:
+                    await f.seek((number - 1) * part_size)
+                    data = await f.read(part_size)
+                part = await self.request("PUT", key, {"partNumber": number, "uploadId": upload_id}, content=data)
+                return number, part.headers["etag"]
+
+        try:
+            parts = await asyncio.gather(*(upload_part(n) for n in range(1, -(-size // part_size) + 1)))
+            body = "".join(f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag></Part>" for n, etag in parts)
+            await self.request(
+                "POST", key, {"uploadId": upload_id},
+                content=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+            )
+        except BaseException:
+            try:
+                await self.request("DELETE", key, {"uploadId": upload_id})
+            except httpx.HTTPError:
+                pass
+            raise
+
+    async def delete(self, key: str):
+        await self.request("DELETE", key)
+
+    def url(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{quote(key)}"
+        return self.presigned_url(key)
+
+    def presigned_url(self, key: str, expires: int = None, method: str = "GET") -> str:
+        path = self.object_path(key)
+        query = self.signer.presign_query(method, self.host, path, expires or settings.S3_PRESIGN_SECONDS)
+        return str(self.endpoint.copy_with(raw_path=f"{quote(path, safe='/-_.~')}?{canonical_query(query)}".encode()))
+
+    async def close(self):
+        await self.client.aclose()
+
+
+@lru_cache
+def get_storage() -> Storage:
+    if settings.STORAGE_DRIVER == "local":
+        return LocalStorage()
+    if settings.STORAGE_DRIVER == "s3":
+        return S3Storage(
+            settings.S3_ENDPOINT_URL,
+            settings.S3_BUCKET,
+            settings.S3_ACCESS_KEY,
+            settings.S3_SECRET_KEY,
+            settings.S3_REGION,
+            settings.S3_PUBLIC_URL,
+        )
+    raise ValueError(f"Unknown STORAGE_DRIVER '{settings.STORAGE_DRIVER}', expected local or s3")
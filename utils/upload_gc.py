@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import shutil
+import time
+from sqlalchemy import delete
+from database.db import engine
+from models.stored_files.stored_files import StoredFiles
+from utils.file_refs import referenced_paths_query
+from utils.images import DERIVATIVE_PATTERN
+from utils.save_files import UPLOAD_DIR
+from utils.storage import get_storage
+from config import settings
+
+# Removes uploads nothing refers to any more. Every referenced path is
+# streamed from the DB into a set of 8 byte hashes, then the upload
+# directory is walked and each file older than the grace period that is
+# not in the set is deleted (or moved to the quarantine directory), at most
+# UPLOAD_GC_DELETES_PER_SECOND per second. Derivatives live as long as
+# their original is referenced. A hash collision can only keep an orphan.
+# Only local storage is swept; orphans in an S3 bucket are not removed.
+#
+#   python -m utils.upload_gc --dry-run
+#   python -m utils.upload_gc --grace-hours 48 --quarantine /var/quarantine/resources
+
+PATH_BATCH_SIZE = 10000
+
+
+def path_key(path: str) -> bytes:
+    return hashlib.blake2b(os.path.normpath(path).encode(), digest_size=8).digest()
+
+
+# Derivatives are matched on their original's path without the extension.
+def stem_key(path: str) -> bytes:
+    return path_key(f"{os.path.splitext(path)[0]}#")
+
+
+async def load_referenced(conn):
+    referenced = set()
+    count = 0
+    result = await conn.stream(
+        referenced_paths_query().execution_options(yield_per=PATH_BATCH_SIZE)
+    )
+    async for paths in result.scalars().partitions():
+        count += len(paths)
+        for path in paths:
+            referenced.add(path_key(path))
+            referenced.add(stem_key(path))
+    return referenced, count
+
+
+def is_referenced(path: str, referenced: set) -> bool:
+    match = DERIVATIVE_PATTERN.search(path)
+    if match:
+        return stem_key(path[:match.start()]) in referenced
+    return path_key(path) in referenced
+
+
+def iter_files(root: str, skip: str = None):
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if skip is None or os.path.normpath(entry.path) != skip:
+                    yield from iter_files(entry.path, skip)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+class RateLimiter:
+    def __init__(self, per_second: float):
+        self.interval = 1 / per_second if per_second > 0 else 0
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+
+def remove(entry, root: str, quarantine: str = None):
+    if quarantine:
+        target = os.path.join(quarantine, os.path.relpath(entry.path, root))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(entry.path, target)
+    else:
+        os.remove(entry.path)
+
+
+def sweep(root: str, referenced: set, grace_seconds: float, per_second: float, quarantine: str = None, dry_run: bool = False):
+    cutoff = time.time() - grace_seconds
+    limiter = RateLimiter(per_second)
+    skip = os.path.normpath(quarantine) if quarantine else None
+    stats = {"scanned": 0, "orphaned": 0, "removed": 0, "bytes": 0, "failed": 0}
+    removed = []
+
+    for entry in iter_files(root, skip):
+        stats["scanned"] += 1
+        if is_referenced(entry.path, referenced):
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime > cutoff:
+            continue
+
+        stats["orphaned"] += 1
+        stats["bytes"] += stat.st_size
+        if dry_run:
+            print(f"  orphan: {entry.path} ({stat.st_size} bytes)")
+            continue
+
+        limiter.wait()
+        try:
+            remove(entry, root, quarantine)
+        except OSError as e:
+            stats["failed"] += 1
+            print(f"  failed: {entry.path}: {e}")
+            continue
+        stats["removed"] += 1
+        removed.append(entry.path)
+
+    return stats, removed
+
+
+async def forget(conn, paths: list):
+    for i in range(0, len(paths), PATH_BATCH_SIZE):
+        await conn.execute(
+            delete(StoredFiles).where(
+                StoredFiles.path.in_(paths[i:i + PATH_BATCH_SIZE]),
+                StoredFiles.ref_count == 0,
+            )
+        )
+
+
+async def collect(root: str, grace_hours: float, per_second: float, quarantine: str = None, dry_run: bool = False):
+    async with engine.connect() as conn:
+        referenced, count = await load_referenced(conn)
+    print(f"{count} references loaded")
+
+    stats, removed = await asyncio.to_thread(
+        sweep, root, referenced, grace_hours * 3600, per_second, quarantine, dry_run
+    )
+    if removed:
+        async with engine.begin() as conn:
+            await forget(conn, removed)
+    await engine.dispose()
+
+    action = "would remove" if dry_run else ("quarantined" if quarantine else "removed")
+    print(
+        f"Scanned {stats['scanned']} files: {stats['orphaned']} orphaned ({stats['bytes']} bytes), "
+        f"{action} {stats['orphaned'] if dry_run else stats['removed']}, {stats['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove uploads no row refers to")
+    parser.add_argument("--dir", default=UPLOAD_DIR)
+    parser.add_argument("--grace-hours", type=float, default=settings.UPLOAD_GC_GRACE_HOURS)
+    parser.add_argument("--rate", type=float, default=settings.UPLOAD_GC_DELETES_PER_SECOND, help="deletes per second, 0 = unlimited")
+    parser.add_argument("--quarantine", default=settings.UPLOAD_GC_QUARANTINE_DIR or None)
+    parser.add_argument("--dry-run", action="store_true", help="only list what would be removed")
+    args = parser.parse_args()
+    if not get_storage().is_local:
+        raise SystemExit("The upload GC only sweeps local storage")
+    asyncio.run(collect(args.dir, args.grace_hours, args.rate, args.quarantine, args.dry_run))